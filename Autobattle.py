@@ -1,10 +1,36 @@
-import random
-import time
+import argparse
 import os
+import random
+
+from autobattle_term import SPEEDS, Clock, Screen
+
+screen = Screen()
+clock = Clock()
+
+# Screen draws with ANSI codes. A legacy Windows console needs colorama to
+# translate them; without it this script falls back to `cls`, as it used to.
+legacy_console = False
+if os.name == "nt":
+    try:
+        from colorama import just_fix_windows_console
+    except ImportError:
+        legacy_console = True
+        screen.enabled = False
+    else:
+        just_fix_windows_console()
 
 # Utility function to clear the screen
 def clear_screen():
-    os.system('cls' if os.name == 'nt' else 'clear')
+    if legacy_console:
+        os.system('cls')
+    else:
+        screen.clear()
+
+# Show what has been printed so far, then wait (scaled by the game speed)
+def pause(seconds):
+    if not clock.skipping:
+        screen.present()
+    clock.wait(seconds)
 
 # ----------------------------
 # Define game objects
@@ -31,6 +57,9 @@ class Armor:
 
 
 class Character:
+    __slots__ = ("name", "max_hp", "hp", "base_attack", "base_defense", "weapon", "armor",
+                 "level", "emoji", "gold", "battles_won")
+
     def __init__(self, name, hp, base_attack, base_defense, emoji):
         self.name = name
         self.max_hp = hp
@@ -69,6 +98,8 @@ class Character:
 
 
 class Enemy:
+    __slots__ = ("name", "max_hp", "hp", "attack", "defense", "emoji", "is_boss")
+
     def __init__(self, name, hp, attack, defense, emoji, is_boss=False):
         self.name = name
         self.max_hp = hp
@@ -151,7 +182,7 @@ def shop_menu(player):
                     print("Invalid choice.")
             except ValueError:
                 print("Please enter a number.")
-            time.sleep(1)
+            pause(1)
         elif choice == "2":
             clear_screen()
             print("Available Armors:")
@@ -166,52 +197,52 @@ def shop_menu(player):
                     print("Invalid choice.")
             except ValueError:
                 print("Please enter a number.")
-            time.sleep(1)
+            pause(1)
         elif choice == "3":
             break
         else:
             print("Invalid choice. Try again.")
-            time.sleep(1)
+            pause(1)
 
 # ----------------------------
 # Enemy Creation and Random Events
 # ----------------------------
 
-def create_enemy(battle_number):
+def create_enemy(battle_number, rng=random):
     # Every 10th battle is a boss battle
     is_boss = (battle_number % 10 == 0)
     if is_boss:
-        name = "Boss " + random.choice(["Goblin King", "Orc Warlord", "Dragon", "Lich"])
+        name = "Boss " + rng.choice(["Goblin King", "Orc Warlord", "Dragon", "Lich"])
         hp = 100 + battle_number * 5
         attack = 15 + battle_number
         defense = 10 + battle_number // 2
         emoji = "👹"
     else:
-        name = random.choice(["Goblin", "Orc", "Skeleton", "Zombie"])
+        name = rng.choice(["Goblin", "Orc", "Skeleton", "Zombie"])
         hp = 50 + battle_number * 3
         attack = 10 + battle_number // 2
         defense = 5 + battle_number // 3
-        emoji = random.choice(["👾", "💀", "🧟", "👹"])
+        emoji = rng.choice(["👾", "💀", "🧟", "👹"])
     return Enemy(name, hp, attack, defense, emoji, is_boss)
 
-def random_event(player):
+def random_event(player, rng=random):
     # 20% chance for a random event after battle
-    if random.random() < 0.2:
+    if rng.random() < 0.2:
         clear_screen()
-        event_type = random.choice(["gold", "trap", "stat"])
+        event_type = rng.choice(["gold", "trap", "stat"])
         if event_type == "gold":
-            gold_found = random.randint(5, 20)
+            gold_found = rng.randint(5, 20)
             player.gold += gold_found
             print(f"Random Event: You discovered a treasure chest with {gold_found} gold! 💰")
         elif event_type == "trap":
-            damage = random.randint(5, 15)
+            damage = rng.randint(5, 15)
             player.hp = max(0, player.hp - damage)
             print(f"Random Event: A hidden trap triggers! You take {damage} damage! ⚠️")
         elif event_type == "stat":
             print("Random Event: A magical aura empowers you! Your stats increase slightly!")
             player.base_attack += 1
             player.base_defense += 1
-        time.sleep(2)
+        pause(2)
 
 # ----------------------------
 # Battle Function
@@ -220,14 +251,14 @@ def random_event(player):
 def battle(player, enemy):
     clear_screen()
     print(f"A wild {enemy.name} {enemy.emoji} appears!")
-    time.sleep(1)
+    pause(1)
     while player.hp > 0 and enemy.hp > 0:
         clear_screen()
         print(f"{player.name} {player.emoji}: HP {player.hp}/{player.max_hp}")
         print(f"{enemy.name} {enemy.emoji}: HP {enemy.hp}/{enemy.max_hp}")
         print("\nBattle in progress...\n")
         # Simulate attack effect
-        time.sleep(0.5)
+        pause(0.5)
         
         # Player attacks enemy
         p_attack = player.total_attack()
@@ -235,7 +266,7 @@ def battle(player, enemy):
         enemy.hp -= damage
         effect = "💥" if damage > 0 else "🌀"
         print(f"{player.name} attacks with {player.weapon.emoji if player.weapon else 'bare hands'} {effect} for {damage} damage!")
-        time.sleep(1)
+        pause(1)
         if enemy.hp <= 0:
             print(f"{enemy.name} is defeated!")
             break
@@ -245,36 +276,41 @@ def battle(player, enemy):
         player.hp -= damage
         effect = "🔥" if damage > 0 else "💨"
         print(f"{enemy.name} attacks {player.name} {effect} for {damage} damage!")
-        time.sleep(1)
+        pause(1)
     return player.hp > 0
 
 # ----------------------------
 # Main Game Loop
 # ----------------------------
 
-def game_loop(player):
+seed = None  # --seed: every game draws the same run
+
+def game_loop(player, seed=None):
+    # With a seed, enemies, gold and events come from a stream of their own
+    rng = random if seed is None else random.Random(f"{seed}:run")
     battle_number = 1
     while player.hp > 0:
-        enemy = create_enemy(battle_number)
-        won = battle(player, enemy)
+        enemy = create_enemy(battle_number, rng)
+        with clock.battle():
+            won = battle(player, enemy)
         if not won:
             break
         player.battles_won += 1
         clear_screen()
         print("Battle won!")
         # Award gold for victory
-        gold_reward = random.randint(10, 30)
+        gold_reward = rng.randint(10, 30)
         player.gold += gold_reward
         print(f"You earned {gold_reward} gold!")
-        time.sleep(1)
+        pause(1)
         # Trigger a random event chance
-        random_event(player)
+        random_event(player, rng)
         # Prompt for leveling up
         print("Do you want to level up your character? (y/n)")
         if input().lower() == "y":
             player.level_up()
             print("Level Up! Your stats have increased!")
-            time.sleep(1)
+            pause(1)
         # Option to visit the shop for new gear
         print("Do you want to visit the shop? (y/n)")
         if input().lower() == "y":
@@ -297,7 +333,7 @@ def start_game():
         player.equip_weapon(weapons[0])
     if not player.armor:
         player.equip_armor(armors[0])
-    game_loop(player)
+    game_loop(player, seed)
 
 def main_menu():
     while True:
@@ -317,7 +353,15 @@ def main_menu():
             break
         else:
             print("Invalid choice. Try again.")
-            time.sleep(1)
+            pause(1)
 
 if __name__ == "__main__":
-    main_menu()
+    parser = argparse.ArgumentParser(description="Dungeon Auto Battler")
+    parser.add_argument("--speed", choices=list(SPEEDS), default="1x",
+                        help="game speed; skip also jumps every battle straight to its result")
+    parser.add_argument("--seed", help="replay the same enemies, gold and events in every game")
+    args = parser.parse_args()
+    clock.set_speed(args.speed)
+    seed = args.seed
+    with screen.attach():
+        main_menu()
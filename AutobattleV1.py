@@ -1,13 +1,19 @@
+import argparse
+import heapq
+import itertools
 import random
 import time
 
 # Define Unit class
 class Unit:
-    def __init__(self, name, health, attack, defense):
+    def __init__(self, name, health, attack, defense, speed=10, initiative=0, taunt=False):
         self.name = name
         self.health = health
         self.attack = attack
         self.defense = defense
+        self.speed = speed              # actions per 100 time units in speed turn order
+        self.initiative = initiative    # who goes first when two units are due at once
+        self.taunt = taunt              # enemies using Taunt targeting must hit this unit first
 
     def take_damage(self, damage):
         damage_taken = max(damage - self.defense, 0)
@@ -17,10 +23,14 @@ class Unit:
     def is_alive(self):
         return self.health > 0
 
-    def attack_enemy(self, enemy):
-        damage = random.randint(self.attack // 2, self.attack)
+    def strike(self, enemy, rng=random):
+        """Attack enemy without any output. Returns (damage rolled, damage taken)."""
+        damage = rng.randint(self.attack // 2, self.attack)
+        return damage, enemy.take_damage(damage)
+
+    def attack_enemy(self, enemy, rng=random):
+        damage, damage_taken = self.strike(enemy, rng)
         print(f"{self.name} attacks {enemy.name} for {damage} damage!")
-        damage_taken = enemy.take_damage(damage)
         print(f"{enemy.name} takes {damage_taken} damage, remaining health: {enemy.health}")
 
 # Define Team class
@@ -28,66 +38,269 @@ class Team:
     def __init__(self, name, units):
         self.name = name
         self.units = units
+        # Living units in no particular order, plus each one's position in that
+        # list, so a death is an O(1) swap-and-pop and a random pick is O(1)
+        self.alive = [unit for unit in units if unit.is_alive()]
+        self.position = {unit: i for i, unit in enumerate(self.alive)}
 
     def get_alive_units(self):
-        return [unit for unit in self.units if unit.is_alive()]
+        return list(self.alive)
+
+    def has_alive(self):
+        return bool(self.alive)
+
+    def random_alive(self, rng=random):
+        return self.alive[int(rng.random() * len(self.alive))]
+
+    def remove_dead(self, unit):
+        """Take a unit that just died out of the alive list."""
+        i = self.position.pop(unit)
+        last = self.alive.pop()
+        if last is not unit:
+            self.alive[i] = last
+            self.position[last] = i
+
+# ----------------------------
+# Turn Order
+# ----------------------------
+
+class TurnQueue:
+    """Units in the order they act: a unit with speed s is due every 100/s time units.
+
+    A heap keyed on (due time, -initiative), so the next actor is O(log n).
+    Dead units are dropped when they come up rather than searched for.
+    """
+
+    def __init__(self, units):
+        self.counter = itertools.count()
+        self.heap = [(100 / unit.speed, -unit.initiative, next(self.counter), unit)
+                     for unit in units if unit.is_alive()]
+        heapq.heapify(self.heap)
+        self.time = 0.0
+
+    def next_unit(self):
+        heap = self.heap
+        while heap:
+            due, order, _, unit = heapq.heappop(heap)
+            if unit.is_alive():
+                self.time = due
+                heapq.heappush(heap, (due + 100 / unit.speed, order, next(self.counter), unit))
+                return unit
+        return None
+
+# ----------------------------
+# Targeting Strategies
+# ----------------------------
+# A strategy picks targets in one (defending) team and is told about every
+# hit on it, so it can keep its index up to date.
+
+class RandomTarget:
+    def __init__(self, team):
+        self.team = team
+
+    def pick(self, rng=random):
+        return self.team.random_alive(rng)
+
+    def hit(self, unit):
+        pass
+
+class LowestHealth(RandomTarget):
+    """Focus the weakest unit: a min-heap on health.
+
+    Health only ever drops, so a hit pushes a fresh entry and the old one is
+    recognised as stale (health no longer matches) when it reaches the top.
+    """
+
+    def __init__(self, team):
+        self.team = team
+        self.counter = itertools.count()
+        self.heap = [(unit.health, next(self.counter), unit) for unit in team.alive]
+        heapq.heapify(self.heap)
+
+    def pick(self, rng=random):
+        heap = self.heap
+        while True:
+            health, _, unit = heap[0]
+            if unit.is_alive() and unit.health == health:
+                return unit
+            heapq.heappop(heap)
+
+    def hit(self, unit):
+        if unit.is_alive():
+            heapq.heappush(self.heap, (unit.health, next(self.counter), unit))
+
+class HighestAttack(RandomTarget):
+    """Take out the biggest threat first: a max-heap on attack, dead units skipped lazily."""
+
+    def __init__(self, team):
+        self.team = team
+        self.heap = [(-unit.attack, i, unit) for i, unit in enumerate(team.alive)]
+        heapq.heapify(self.heap)
+
+    def pick(self, rng=random):
+        heap = self.heap
+        while not heap[0][2].is_alive():
+            heapq.heappop(heap)
+        return heap[0][2]
+
+class Taunt(RandomTarget):
+    """Units with taunt must be attacked first; after that, fall back to another strategy."""
+
+    fallback = RandomTarget
+
+    def __init__(self, team):
+        self.team = team
+        self.taunters = Team(team.name, [unit for unit in team.alive if unit.taunt])
+        self.next_choice = self.fallback(team)
+
+    def pick(self, rng=random):
+        if self.taunters.alive:
+            return self.taunters.random_alive(rng)
+        return self.next_choice.pick(rng)
+
+    def hit(self, unit):
+        self.next_choice.hit(unit)
+        if not unit.is_alive() and unit.taunt:
+            self.taunters.remove_dead(unit)
+
+TARGETING = {
+    "random": RandomTarget,
+    "lowest": LowestHealth,
+    "strongest": HighestAttack,
+    "taunt": Taunt,
+}
 
 # Define AutoBattler class
 class AutoBattler:
-    def __init__(self, team1, team2):
+    def __init__(self, team1, team2, verbose=True, delay=1.0, rng=random,
+                 turn_order="random", targeting=(RandomTarget, RandomTarget)):
         self.team1 = team1
         self.team2 = team2
+        self.verbose = verbose  # print every hit, as the original game did
+        self.delay = delay      # seconds between rounds
+        self.rng = rng
+        self.rounds = 0
+        # "random": each round one random unit per side attacks, team 1 first.
+        # "speed": each round the next unit due in the TurnQueue acts.
+        self.turn_order = turn_order
+        self.queue = TurnQueue(team1.units + team2.units) if turn_order == "speed" else None
+        self.enemies = {team1: team2, team2: team1}
+        self.team_of = None
+        if self.queue:
+            self.team_of = {unit: team for team in (team1, team2) for unit in team.units}
+        # Each team's strategy, indexing the team it attacks
+        self.targeting = {team1: targeting[0](team2), team2: targeting[1](team1)}
 
     def battle(self):
+        """Fight until one team is wiped out. Returns the winning team."""
         round_counter = 1
-        while self.team1.get_alive_units() and self.team2.get_alive_units():
-            print(f"\n--- Round {round_counter} ---")
+        while self.team1.has_alive() and self.team2.has_alive():
+            if self.verbose:
+                print(f"\n--- Round {round_counter} ---")
             self.simulate_turn()
             round_counter += 1
-            time.sleep(1)
+            if self.delay:
+                time.sleep(self.delay)
+        self.rounds = round_counter - 1
+        return self.end_battle()
 
-        self.end_battle()
+    def attack(self, unit, attackers):
+        defenders = self.enemies[attackers]
+        strategy = self.targeting[attackers]
+        target = strategy.pick(self.rng)
+        damage, damage_taken = unit.strike(target, self.rng)
+        strategy.hit(target)
+        if self.verbose:
+            print(f"{unit.name} attacks {target.name} for {damage} damage!")
+            print(f"{target.name} takes {damage_taken} damage, remaining health: {target.health}")
+        if not target.is_alive():
+            defenders.remove_dead(target)
+            if self.verbose:
+                print(f"{target.name} has been defeated!")
 
     def simulate_turn(self):
-        team1_unit = random.choice(self.team1.get_alive_units())
-        team2_unit = random.choice(self.team2.get_alive_units())
-
+        if self.queue:
+            unit = self.queue.next_unit()
+            self.attack(unit, self.team_of[unit])
+            return
         # Team 1 attacks Team 2
-        team1_unit.attack_enemy(team2_unit)
+        self.attack(self.team1.random_alive(self.rng), self.team1)
+        # Team 2 attacks Team 1
+        if self.team2.has_alive():
+            self.attack(self.team2.random_alive(self.rng), self.team2)
 
-        if not team2_unit.is_alive():
-            print(f"{team2_unit.name} has been defeated!")
+    def end_battle(self):
+        if not self.team1.has_alive():
+            winner = self.team2
+        elif not self.team2.has_alive():
+            winner = self.team1
+        else:
+            return None
+        if self.verbose:
+            print(f"\n{winner.name} wins the battle!")
+        return winner
 
-        # Team 2 attacks Team 1
-        if self.team1.get_alive_units() and self.team2.get_alive_units():
-            team2_unit = random.choice(self.team2.get_alive_units())
-            team1_unit = random.choice(self.team1.get_alive_units())
-            team2_unit.attack_enemy(team1_unit)
+# Unit archetypes: name, health, attack, defense, speed, taunt
+ARCHETYPES = [
+    ("Warrior", 100, 20, 5, 10, False),
+    ("Archer", 80, 25, 3, 12, False),
+    ("Mage", 70, 30, 2, 9, False),
+    ("Tank", 150, 15, 10, 6, True),
+    ("Knight", 120, 18, 7, 8, True),
+    ("Assassin", 60, 35, 1, 16, False),
+    ("Priest", 90, 10, 5, 9, False),
+    ("Berserker", 110, 28, 4, 11, False),
+]
 
-            if not team1_unit.is_alive():
-                print(f"{team1_unit.name} has been defeated!")
+def make_team(name, size, rng=random):
+    """A team of size units drawn from the archetypes."""
+    units = []
+    for i in range(size):
+        unit_name, health, attack, defense, speed, taunt = rng.choice(ARCHETYPES)
+        units.append(Unit(f"{unit_name} {i + 1}", health, attack, defense,
+                          speed=speed, initiative=rng.random(), taunt=taunt))
+    return Team(name, units)
 
-    def end_battle(self):
-        if not self.team1.get_alive_units():
-            print(f"\n{self.team2.name} wins the battle!")
-        elif not self.team2.get_alive_units():
-            print(f"\n{self.team1.name} wins the battle!")
-
-# Example units
-unit1 = Unit("Warrior", health=100, attack=20, defense=5)
-unit2 = Unit("Archer", health=80, attack=25, defense=3)
-unit3 = Unit("Mage", health=70, attack=30, defense=2)
-unit4 = Unit("Tank", health=150, attack=15, defense=10)
-
-unit5 = Unit("Knight", health=120, attack=18, defense=7)
-unit6 = Unit("Assassin", health=60, attack=35, defense=1)
-unit7 = Unit("Priest", health=90, attack=10, defense=5)
-unit8 = Unit("Berserker", health=110, attack=28, defense=4)
-
-# Create two teams
-team1 = Team("Red Team", [unit1, unit2, unit3, unit4])
-team2 = Team("Blue Team", [unit5, unit6, unit7, unit8])
-
-# Start the battle
-battler = AutoBattler(team1, team2)
-battler.battle()
+def example_teams():
+    unit1 = Unit("Warrior", health=100, attack=20, defense=5)
+    unit2 = Unit("Archer", health=80, attack=25, defense=3)
+    unit3 = Unit("Mage", health=70, attack=30, defense=2)
+    unit4 = Unit("Tank", health=150, attack=15, defense=10)
+
+    unit5 = Unit("Knight", health=120, attack=18, defense=7)
+    unit6 = Unit("Assassin", health=60, attack=35, defense=1)
+    unit7 = Unit("Priest", health=90, attack=10, defense=5)
+    unit8 = Unit("Berserker", health=110, attack=28, defense=4)
+
+    # Create two teams
+    team1 = Team("Red Team", [unit1, unit2, unit3, unit4])
+    team2 = Team("Blue Team", [unit5, unit6, unit7, unit8])
+    return team1, team2
+
+def main():
+    parser = argparse.ArgumentParser(description="Team auto battler")
+    parser.add_argument("--size", type=int, help="units per team; runs a silent battle of random units and times it")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--turn-order", choices=["random", "speed"], default="random")
+    parser.add_argument("--red-targeting", choices=sorted(TARGETING), default="random")
+    parser.add_argument("--blue-targeting", choices=sorted(TARGETING), default="random")
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    options = dict(rng=rng, turn_order=args.turn_order,
+                   targeting=(TARGETING[args.red_targeting], TARGETING[args.blue_targeting]))
+
+    if args.size is None:
+        # Start the battle
+        team1, team2 = example_teams()
+        AutoBattler(team1, team2, **options).battle()
+        return
+    team1, team2 = make_team("Red Team", args.size, rng), make_team("Blue Team", args.size, rng)
+    battler = AutoBattler(team1, team2, verbose=False, delay=0, **options)
+    start = time.perf_counter()
+    winner = battler.battle()
+    elapsed = time.perf_counter() - start
+    print(f"{winner.name} wins {args.size}v{args.size} with {len(winner.alive)} units left "
+          f"after {battler.rounds} rounds ({elapsed * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,44 @@
+import argparse
 import random
-import time
 import os
 import json
+import hashlib
+import struct
 from colorama import init, Fore, Style
 
+from autobattle_content import ContentPack
+from autobattle_leaderboard import Leaderboard, import_high_score_file
+from autobattle_save import SaveStore
+from autobattle_term import SPEEDS, Clock, Screen
+
 # Initialize colorama for colored terminal output
 init(autoreset=True)
 
 # Global difficulty multiplier (default normal)
 DIFFICULTY = 1.0
 
+# Check every cached total_attack()/total_defense() against a fresh computation
+# (see enable_stat_checks); also switched on by AUTOBATTLE_DEBUG_STATS=1
+DEBUG_STATS = os.environ.get("AUTOBATTLE_DEBUG_STATS") == "1"
+
+# Seed for an independent random stream, derived from a master seed and a path
+# such as ("run", 42) or ("battle", 7). Stable across processes and platforms.
+def derive_seed(seed, *path):
+    digest = hashlib.blake2b(repr((seed,) + path).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+screen = Screen(autoreset=True)
+clock = Clock()
+
 # Utility function to clear the screen
 def clear_screen():
-    os.system('cls' if os.name == 'nt' else 'clear')
+    screen.clear()
+
+# Show what has been printed so far, then wait (scaled by the game speed)
+def pause(seconds):
+    if not clock.skipping:
+        screen.present()
+    clock.wait(seconds)
 
 # ----------------------------
 # Data Classes
@@ -47,6 +73,10 @@ class Item:
         return f"{self.name} {self.emoji} (Restores {self.effect} HP, Cost: {self.cost} gold)"
 
 class Character:
+    __slots__ = ("name", "max_hp", "hp", "base_attack", "base_defense", "weapon", "armor",
+                 "level", "emoji", "gold", "battles_won", "inventory", "special_meter",
+                 "combo_meter", "ability_cooldown", "_attack", "_defense")
+
     def __init__(self, name, hp, base_attack, base_defense, emoji):
         self.name = name
         self.max_hp = hp
@@ -63,29 +93,45 @@ class Character:
         self.special_meter = 0  # Build up for a special ability (triple damage)
         self.combo_meter = 0    # Increases with consecutive hits
         self.ability_cooldown = 0  # Turns remaining before class ability can be used again
+        self.refresh_stats()
 
-    def total_attack(self):
+    # Derived stats are cached: anything that changes base stats or gear must
+    # go through level_up/equip_* or call refresh_stats() afterwards.
+    def compute_attack(self):
         if self.weapon:
             return self.base_attack + self.weapon.bonus_attack
         return self.base_attack
 
-    def total_defense(self):
+    def compute_defense(self):
         if self.armor:
             return self.base_defense + self.armor.bonus_defense
         return self.base_defense
 
+    def refresh_stats(self):
+        self._attack = self.compute_attack()
+        self._defense = self.compute_defense()
+
+    def total_attack(self):
+        return self._attack
+
+    def total_defense(self):
+        return self._defense
+
     def level_up(self):
         self.level += 1
         self.max_hp += 10
         self.hp = self.max_hp
         self.base_attack += 2
         self.base_defense += 2
+        self.refresh_stats()
 
     def equip_weapon(self, weapon):
         self.weapon = weapon
+        self.refresh_stats()
 
     def equip_armor(self, armor):
         self.armor = armor
+        self.refresh_stats()
 
     def add_item(self, item, quantity=1):
         if item.name in self.inventory:
@@ -93,74 +139,112 @@ class Character:
         else:
             self.inventory[item.name] = {'item': item, 'quantity': quantity}
 
-    def use_item(self):
+    def prompt_item(self):
+        """Show the inventory and ask which item to use. Returns the item name or None."""
         if not self.inventory:
             print(Fore.YELLOW + "You have no items in your inventory!")
-            return False
+            return None
         print(Fore.CYAN + "Inventory:")
         for idx, (item_name, info) in enumerate(self.inventory.items(), 1):
             print(f"{idx}. {info['item']} x{info['quantity']}")
         try:
             choice = int(input("Choose an item to use (0 to cancel): "))
             if choice == 0:
-                return False
+                return None
             if 1 <= choice <= len(self.inventory):
-                chosen_item = list(self.inventory.items())[choice - 1]
-                item_obj = chosen_item[1]['item']
-                heal = item_obj.effect
-                self.hp = min(self.max_hp, self.hp + heal)
-                print(Fore.GREEN + f"Used {item_obj.name} {item_obj.emoji}. Restored {heal} HP!")
-                self.inventory[item_obj.name]['quantity'] -= 1
-                if self.inventory[item_obj.name]['quantity'] <= 0:
-                    del self.inventory[item_obj.name]
-                return True
+                return list(self.inventory)[choice - 1]
             else:
                 print(Fore.YELLOW + "Invalid choice.")
-                return False
+                return None
         except ValueError:
             print(Fore.YELLOW + "Invalid input.")
+            return None
+
+    def consume_item(self, item_name):
+        """Use one item from the inventory without any output. Returns the Item used."""
+        item_obj = self.inventory[item_name]['item']
+        self.hp = min(self.max_hp, self.hp + item_obj.effect)
+        self.inventory[item_name]['quantity'] -= 1
+        if self.inventory[item_name]['quantity'] <= 0:
+            del self.inventory[item_name]
+        return item_obj
+
+    def use_item(self):
+        item_name = self.prompt_item()
+        if item_name is None:
             return False
+        item_obj = self.consume_item(item_name)
+        print(Fore.GREEN + f"Used {item_obj.name} {item_obj.emoji}. Restored {item_obj.effect} HP!")
+        return True
 
     def use_special_ability(self, enemy):
-        """Use special ability: deals triple damage and resets special meter."""
+        """Use special ability: deals triple damage and resets special meter.
+
+        Returns the damage dealt (0 if the meter is not full)."""
         if self.special_meter >= 100:
             bonus = self.total_attack() * 3
             enemy.hp -= bonus
-            print(Fore.RED + f"{self.name} unleashes a SPECIAL MOVE {self.weapon.emoji if self.weapon else 'fists'} for {bonus} damage!")
             self.special_meter = 0
             self.combo_meter = 0  # Reset combo meter as well
-            return True
-        return False
+            return bonus
+        return 0
 
     def use_class_ability(self, enemy):
-        """Unique ability based on character class (only if cooldown is 0)."""
+        """Unique ability based on character class (only if cooldown is 0).
+
+        Returns the damage dealt, or None if the ability is still on cooldown."""
         if self.ability_cooldown > 0:
-            print(Fore.YELLOW + "Your class ability is not ready yet!")
-            return False
+            return None
 
+        damage = 0
         if self.name == "Knight":
             # Shield Bash: moderate damage and stun enemy for next turn
             damage = int(self.total_attack() * 1.2)
             enemy.hp -= damage
-            enemy.status_effects["stunned"] = 1  # Enemy misses next turn
-            print(Fore.RED + f"{self.name} uses Shield Bash, dealing {damage} damage and stunning the enemy!")
+            enemy.stunned = 1  # Enemy misses next turn
         elif self.name == "Wizard":
             # Fireball: heavy damage and apply burn (damage over 2 turns)
             damage = int(self.total_attack() * 1.5)
             enemy.hp -= damage
-            enemy.status_effects["burn"] = 2  # Burn effect for 2 turns
-            print(Fore.RED + f"{self.name} casts Fireball, dealing {damage} damage and burning the enemy!")
+            enemy.burn = 2  # Burn effect for 2 turns
         elif self.name == "Rogue":
             # Double Strike: two quick attacks
             damage1 = max(0, self.total_attack() - enemy.defense)
             damage2 = max(0, self.total_attack() - enemy.defense)
-            total_damage = damage1 + damage2
-            enemy.hp -= total_damage
-            print(Fore.RED + f"{self.name} uses Double Strike for a total of {total_damage} damage!")
+            damage = damage1 + damage2
+            enemy.hp -= damage
         self.ability_cooldown = 3  # Ability goes on cooldown for 3 turns
-        return True
+        return damage
+
+_cached_total_attack = Character.total_attack
+_cached_total_defense = Character.total_defense
+
+def _checked_total_attack(self):
+    fresh = self.compute_attack()
+    if self._attack != fresh:
+        raise RuntimeError(f"{self.name}: cached attack {self._attack} != {fresh}, refresh_stats() was skipped")
+    return fresh
+
+def _checked_total_defense(self):
+    fresh = self.compute_defense()
+    if self._defense != fresh:
+        raise RuntimeError(f"{self.name}: cached defense {self._defense} != {fresh}, refresh_stats() was skipped")
+    return fresh
+
+def enable_stat_checks(enabled=True):
+    """Debug mode: total_attack()/total_defense() verify the cache on every call."""
+    global DEBUG_STATS
+    DEBUG_STATS = enabled
+    Character.total_attack = _checked_total_attack if enabled else _cached_total_attack
+    Character.total_defense = _checked_total_defense if enabled else _cached_total_defense
+
+if DEBUG_STATS:
+    enable_stat_checks()
 
 class Enemy:
+    __slots__ = ("name", "max_hp", "hp", "attack", "defense", "emoji", "is_boss", "heal_used",
+                 "burn", "stunned")
+
     def __init__(self, name, hp, attack, defense, emoji, is_boss=False):
         self.name = name
         self.max_hp = hp
@@ -170,39 +254,34 @@ class Enemy:
         self.emoji = emoji
         self.is_boss = is_boss
         self.heal_used = False  # Can heal once per battle
-        self.status_effects = {}  # e.g., {"stunned": turns, "burn": turns}
+        # Status effects, in turns remaining
+        self.burn = 0
+        self.stunned = 0
 
 # ----------------------------
 # Game Data
 # ----------------------------
 
-weapons = [
-    Weapon("Sword", 5, "🗡️"),
-    Weapon("Axe", 7, "⚔️"),
-    Weapon("Dagger", 3, "🔪"),
-    Weapon("Mace", 6, "🔨")
-]
-
-armors = [
-    Armor("Leather Armor", 3, "🛡️"),
-    Armor("Chainmail", 5, "🛡️"),
-    Armor("Plate Armor", 8, "🛡️")
-]
-
-items = [
-    Item("Health Potion", 30, 20, "🧪"),
-    Item("Greater Health Potion", 50, 35, "🧪"),
-    Item("Elixir", 100, 50, "✨")
-]
+# Weapons, armors, items and enemy names come from the content file (see
+# autobattle_content.py). The registries act as lists and load on first use.
+CONTENT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "autobattle_content.json")
+content = ContentPack(CONTENT_FILE)
+weapons = content.registry("weapons", Weapon)
+armors = content.registry("armors", Armor)
+items = content.registry("items", Item)
 
 # ----------------------------
 # Save/Load and High Score Functions
 # ----------------------------
 
-SAVE_FILE = "savegame.json"
+SAVE_DIR = "saves"
+SAVE_FILE = "savegame.json"  # the single save of older versions, imported into slot 1
+SAVE_SLOTS = 3
+save_slot = 1  # slot save_game() and autosave() write to, picked in start_game()
+save_store = SaveStore(SAVE_DIR)
 
-def save_game(player):
-    data = {
+def character_state(player):
+    return {
         "name": player.name,
         "hp": player.hp,
         "max_hp": player.max_hp,
@@ -219,56 +298,187 @@ def save_game(player):
         "inventory": {k: v['quantity'] for k, v in player.inventory.items()},
         "emoji": player.emoji
     }
-    with open(SAVE_FILE, "w") as f:
-        json.dump(data, f)
+
+def character_from_state(data):
+    player = Character(data["name"], data["max_hp"], data["base_attack"], data["base_defense"], data["emoji"])
+    player.hp = data["hp"]
+    player.level = data["level"]
+    player.gold = data["gold"]
+    player.battles_won = data["battles_won"]
+    player.special_meter = data["special_meter"]
+    player.combo_meter = data["combo_meter"]
+    player.ability_cooldown = data["ability_cooldown"]
+    if data["weapon"]:
+        player.equip_weapon(weapons.by_name(data["weapon"]))
+    if data["armor"]:
+        player.equip_armor(armors.by_name(data["armor"]))
+    for item_name, qty in data["inventory"].items():
+        player.inventory[item_name] = {'item': items.by_name(item_name), 'quantity': qty}
+    return player
+
+# Binary character snapshots, for keeping many characters cheaply (e.g. from
+# simulations). Layout: format version byte, name and emoji (length byte plus
+# UTF-8), the fixed CHARACTER_STATS block, then one INVENTORY_ENTRY per item.
+# Gear and items are stored by content ID (position in the content file), so
+# new content must be appended to its section, never inserted.
+CHARACTER_FORMAT = 2
+CHARACTER_STATS = struct.Struct("<iIHHHIIBBBHHH")  # hp, max_hp, base atk/def, level, gold, battles_won,
+                                                   # special, combo, cooldown, weapon, armor, item count
+INVENTORY_ENTRY = struct.Struct("<HI")             # item index, quantity
+NO_GEAR = 0xFFFF
+
+# Format 1 stored gear and item IDs in a byte (0xFF for no gear); still readable
+CHARACTER_LAYOUTS = {
+    1: (struct.Struct("<iIHHHIIBBBBBB"), struct.Struct("<BI"), 0xFF),
+    2: (CHARACTER_STATS, INVENTORY_ENTRY, NO_GEAR),
+}
+
+# Names and emoji repeat endlessly across snapshots and battle records, so both
+# directions are cached
+_encoded_text = {}
+
+def pack_text(text):
+    """text as a length byte plus UTF-8 (at most 255 bytes)."""
+    packed = _encoded_text.get(text)
+    if packed is None:
+        data = text.encode("utf-8")
+        packed = _encoded_text[text] = bytes((len(data),)) + data
+    return packed
+
+_decoded_text = {}
+
+def unpack_text(data, pos):
+    """The pack_text() string at data[pos]. Returns (text, end position)."""
+    end = pos + 1 + data[pos]
+    raw = data[pos + 1:end]
+    text = _decoded_text.get(raw)
+    if text is None:
+        text = _decoded_text[raw] = raw.decode("utf-8")
+    return text, end
+
+def encode_character(player):
+    """The binary snapshot of player (bytes)."""
+    inventory = player.inventory
+    item_ids = items.ids
+    parts = [bytes((CHARACTER_FORMAT,)), pack_text(player.name), pack_text(player.emoji),
+             CHARACTER_STATS.pack(player.hp, player.max_hp, player.base_attack, player.base_defense,
+                                  player.level, player.gold, player.battles_won, player.special_meter,
+                                  player.combo_meter, player.ability_cooldown,
+                                  weapons.id_of(player.weapon.name) if player.weapon else NO_GEAR,
+                                  armors.id_of(player.armor.name) if player.armor else NO_GEAR,
+                                  len(inventory))]
+    for item_name, info in inventory.items():
+        parts.append(INVENTORY_ENTRY.pack(item_ids[item_name], info['quantity']))
+    return b"".join(parts)
+
+def decode_character_from(data, pos=0):
+    """Decode the snapshot starting at data[pos]. Returns (Character, end position)."""
+    layout = CHARACTER_LAYOUTS.get(data[pos])
+    if layout is None:
+        raise ValueError(f"Unknown character format {data[pos]}")
+    stats, entry, no_gear = layout
+    name, pos = unpack_text(data, pos + 1)
+    emoji, pos = unpack_text(data, pos)
+    (hp, max_hp, base_attack, base_defense, level, gold, battles_won, special, combo, cooldown,
+     weapon, armor, n_items) = stats.unpack_from(data, pos)
+    pos += stats.size
+    # Every slot is set here, so skip __init__ and refresh the derived stats once
+    player = Character.__new__(Character)
+    player.name = name
+    player.emoji = emoji
+    player.hp = hp
+    player.max_hp = max_hp
+    player.base_attack = base_attack
+    player.base_defense = base_defense
+    player.weapon = weapons[weapon] if weapon != no_gear else None
+    player.armor = armors[armor] if armor != no_gear else None
+    player.level = level
+    player.gold = gold
+    player.battles_won = battles_won
+    player.special_meter = special
+    player.combo_meter = combo
+    player.ability_cooldown = cooldown
+    player.inventory = inventory = {}
+    player.refresh_stats()
+    for _ in range(n_items):
+        index, quantity = entry.unpack_from(data, pos)
+        pos += entry.size
+        itm = items[index]
+        inventory[itm.name] = {'item': itm, 'quantity': quantity}
+    return player, pos
+
+def decode_character(data):
+    return decode_character_from(data)[0]
+
+def encode_characters(players):
+    """Many snapshots back to back, e.g. to write a whole simulation sample to one file."""
+    return b"".join(map(encode_character, players))
+
+def decode_characters(data):
+    players = []
+    pos = 0
+    while pos < len(data):
+        player, pos = decode_character_from(data, pos)
+        players.append(player)
+    return players
+
+def save_game(player):
+    save_store.save(save_slot, character_state(player))
     print(Fore.GREEN + "Game saved!")
-    time.sleep(1)
+    pause(1)
 
-def load_game():
-    try:
+def autosave(player):
+    """Silent save between battles; only the changed fields are written."""
+    save_store.autosave(save_slot, character_state(player))
+
+def import_legacy_save():
+    if not save_store.slots() and os.path.exists(SAVE_FILE):
         with open(SAVE_FILE, "r") as f:
-            data = json.load(f)
-        player = Character(data["name"], data["max_hp"], data["base_attack"], data["base_defense"], data["emoji"])
-        player.hp = data["hp"]
-        player.level = data["level"]
-        player.gold = data["gold"]
-        player.battles_won = data["battles_won"]
-        player.special_meter = data["special_meter"]
-        player.combo_meter = data["combo_meter"]
-        player.ability_cooldown = data["ability_cooldown"]
-        if data["weapon"]:
-            for w in weapons:
-                if w.name == data["weapon"]:
-                    player.weapon = w
-                    break
-        if data["armor"]:
-            for a in armors:
-                if a.name == data["armor"]:
-                    player.armor = a
-                    break
-        for item_name, qty in data["inventory"].items():
-            for itm in items:
-                if itm.name == item_name:
-                    player.inventory[item_name] = {'item': itm, 'quantity': qty}
-                    break
+            save_store.save(1, json.load(f))
+
+def load_game(slot):
+    try:
+        data = save_store.load(slot)
+        if data is None:
+            raise ValueError(f"slot {slot} is empty")
+        player = character_from_state(data)
+        if player.hp <= 0:
+            # Saves from before the trap check; loading one would end (and be scored) again
+            raise ValueError(f"{player.name} in slot {slot} has already fallen")
         print(Fore.GREEN + "Game loaded successfully!")
-        time.sleep(1)
+        pause(1)
         return player
     except Exception as e:
         print(Fore.RED + f"Failed to load game: {e}")
-        time.sleep(1)
+        pause(1)
         return None
 
+def choose_slot(title):
+    import_legacy_save()
+    while True:
+        clear_screen()
+        print(Fore.MAGENTA + f"=== {title} ===")
+        for slot in range(1, SAVE_SLOTS + 1):
+            data = save_store.load(slot)
+            if data:
+                print(f"{slot}. {data['name']} {data['emoji']} - Level {data['level']}, {data['battles_won']} battles won")
+            else:
+                print(f"{slot}. (empty)")
+        choice = input("Choose a slot: ")
+        if choice.isdigit() and 1 <= int(choice) <= SAVE_SLOTS:
+            return int(choice)
+        print("Invalid choice. Try again.")
+        pause(1)
+
+LEADERBOARD_FILE = "leaderboard.db"
+leaderboard = Leaderboard(LEADERBOARD_FILE)
+
 def load_high_score():
-    try:
-        with open("highscore.txt", "r") as f:
-            return int(f.read())
-    except:
-        return 0
+    import_high_score_file(leaderboard)
+    return leaderboard.high_score()
 
-def save_high_score(score):
-    with open("highscore.txt", "w") as f:
-        f.write(str(score))
+def record_run(player):
+    leaderboard.submit(player.name, DIFFICULTY, player.battles_won)
 
 # ----------------------------
 # Menus and Setup
@@ -281,14 +491,26 @@ def game_intro():
     print("and challenge the forces of darkness. May the dice roll in your favor, and your sword strike true!")
     input("\nPress Enter to begin your quest...")
 
-def choose_character():
-    clear_screen()
-    print(Fore.MAGENTA + "=== Choose Your Character ===")
-    characters = [
+def starting_characters():
+    return [
         Character("Knight", 100, 15, 10, "🤺"),
         Character("Wizard", 80, 20, 5, "🧙"),
         Character("Rogue", 90, 18, 8, "🗡️")
     ]
+
+def new_character(class_name):
+    """A fresh character of the given class in the default gear start_game() hands out."""
+    for player in starting_characters():
+        if player.name == class_name:
+            player.equip_weapon(weapons[0])
+            player.equip_armor(armors[0])
+            return player
+    raise ValueError(f"Unknown class: {class_name}")
+
+def choose_character():
+    clear_screen()
+    print(Fore.MAGENTA + "=== Choose Your Character ===")
+    characters = starting_characters()
     for i, char in enumerate(characters, 1):
         print(f"{i}. {char.name} {char.emoji} - HP: {char.max_hp}, ATK: {char.base_attack}, DEF: {char.base_defense}")
         if char.name == "Knight":
@@ -312,7 +534,8 @@ def options_menu():
     clear_screen()
     print(Fore.MAGENTA + "=== Options Menu ===")
     print("1. Set Difficulty")
-    print("2. Back")
+    print("2. Set Game Speed")
+    print("3. Back")
     choice = input("Enter choice: ")
     if choice == "1":
         print("Select Difficulty:")
@@ -331,7 +554,19 @@ def options_menu():
             print("Difficulty set to Hard!")
         else:
             print("Invalid choice. Setting remains unchanged.")
-        time.sleep(1)
+        pause(1)
+    elif choice == "2":
+        print(f"Select Game Speed (currently {clock.speed}):")
+        speeds = list(SPEEDS)
+        for i, speed in enumerate(speeds, 1):
+            print(f"{i}. {speed}")
+        speed_choice = input("Enter choice: ")
+        if speed_choice.isdigit() and 1 <= int(speed_choice) <= len(speeds):
+            clock.set_speed(speeds[int(speed_choice) - 1])
+            print(f"Game speed set to {clock.speed}!")
+        else:
+            print("Invalid choice. Setting remains unchanged.")
+        pause(1)
     input("Press Enter to return to the main menu...")
 
 def shop_menu(player):
@@ -359,7 +594,7 @@ def shop_menu(player):
                     print("Invalid choice.")
             except ValueError:
                 print("Please enter a number.")
-            time.sleep(1)
+            pause(1)
         elif choice == "2":
             clear_screen()
             print("Available Armors:")
@@ -374,7 +609,7 @@ def shop_menu(player):
                     print("Invalid choice.")
             except ValueError:
                 print("Please enter a number.")
-            time.sleep(1)
+            pause(1)
         elif choice == "3":
             clear_screen()
             print("Available Items:")
@@ -394,128 +629,458 @@ def shop_menu(player):
                     print("Invalid choice.")
             except ValueError:
                 print("Please enter a number.")
-            time.sleep(1)
+            pause(1)
         elif choice == "4":
             save_game(player)
         elif choice == "5":
             break
         else:
             print("Invalid choice. Try again.")
-            time.sleep(1)
+            pause(1)
 
 # ----------------------------
 # Enemy Creation and Random Events
 # ----------------------------
 
-def create_enemy(battle_number):
+def enemy_stat_block(battle_number, difficulty, is_boss):
+    """(hp, attack, defense) of an enemy at battle_number. The formulas live here only."""
+    if is_boss:
+        return (int((100 + battle_number * 5) * difficulty),
+                int((15 + battle_number) * difficulty),
+                int((10 + battle_number // 2) * difficulty))
+    return (int((50 + battle_number * 3) * difficulty),
+            int((10 + battle_number // 2) * difficulty),
+            int((5 + battle_number // 3) * difficulty))
+
+class EnemyStatTable:
+    """Enemy stat blocks for one difficulty, regular and boss, indexed by battle_number.
+
+    Rows are computed in blocks the first time a battle_number past the end
+    is asked for. arrays() gives the same rows as numpy arrays, for spawning
+    whole waves at once (e.g. hp[battle_numbers]).
+    """
+
+    BLOCK = 64
+
+    def __init__(self, difficulty):
+        self.difficulty = difficulty
+        self.rows = {False: [], True: []}
+        self._arrays = {}
+
+    def extend(self, battle_number):
+        size = len(self.rows[False])
+        if battle_number < size:
+            return
+        top = max(battle_number + 1, size + self.BLOCK)
+        for is_boss, rows in self.rows.items():
+            rows.extend(enemy_stat_block(n, self.difficulty, is_boss) for n in range(size, top))
+        self._arrays.clear()
+
+    def stats(self, battle_number, is_boss):
+        rows = self.rows[is_boss]
+        if battle_number >= len(rows):
+            self.extend(battle_number)
+        return rows[battle_number]
+
+    def arrays(self, upto, is_boss=None):
+        """(hp, attack, defense) int64 arrays over battle_numbers 0..upto.
+
+        With is_boss=None every 10th row is the boss block, as create_enemy() does.
+        """
+        import numpy as np  # only the simulators need this
+
+        self.extend(upto)
+        key = (is_boss, upto)
+        arrays = self._arrays.get(key)
+        if arrays is None:
+            if is_boss is None:
+                regular = np.array(self.rows[False][:upto + 1], dtype=np.int64)
+                boss = np.array(self.rows[True][:upto + 1], dtype=np.int64)
+                table = np.where((np.arange(upto + 1) % 10 == 0)[:, None], boss, regular)
+            else:
+                table = np.array(self.rows[is_boss][:upto + 1], dtype=np.int64)
+            arrays = self._arrays[key] = (table[:, 0], table[:, 1], table[:, 2])
+        return arrays
+
+_enemy_tables = {}
+
+def enemy_stat_table(difficulty=None):
+    """The shared EnemyStatTable for a difficulty (default: the current DIFFICULTY)."""
+    if difficulty is None:
+        difficulty = DIFFICULTY
+    table = _enemy_tables.get(difficulty)
+    if table is None:
+        table = _enemy_tables[difficulty] = EnemyStatTable(difficulty)
+    return table
+
+def create_enemy(battle_number, rng=random, difficulty=None):
     # Every 10th battle is a boss battle
     is_boss = (battle_number % 10 == 0)
+    hp, attack, defense = enemy_stat_table(difficulty).stats(battle_number, is_boss)
+    enemies = content["enemies"]
     if is_boss:
-        name = "Boss " + random.choice(["Goblin King", "Orc Warlord", "Dragon", "Lich"])
-        hp = int((100 + battle_number * 5) * DIFFICULTY)
-        attack = int((15 + battle_number) * DIFFICULTY)
-        defense = int((10 + battle_number // 2) * DIFFICULTY)
-        emoji = "👹"
+        name = "Boss " + rng.choice(enemies["boss_names"])
+        emoji = enemies["boss_emoji"]
     else:
-        name = random.choice(["Goblin", "Orc", "Skeleton", "Zombie"])
-        hp = int((50 + battle_number * 3) * DIFFICULTY)
-        attack = int((10 + battle_number // 2) * DIFFICULTY)
-        defense = int((5 + battle_number // 3) * DIFFICULTY)
-        emoji = random.choice(["👾", "💀", "🧟", "👹"])
+        name = rng.choice(enemies["names"])
+        emoji = rng.choice(enemies["emoji"])
     return Enemy(name, hp, attack, defense, emoji, is_boss)
 
-def random_event(player):
-    # 20% chance for a random event after battle
-    if random.random() < 0.2:
-        clear_screen()
-        event_type = random.choice(["gold", "trap", "stat", "potion", "fountain"])
-        if event_type == "gold":
-            gold_found = random.randint(5, 20)
-            player.gold += gold_found
-            print(Fore.GREEN + f"Random Event: You discovered a treasure chest with {gold_found} gold! 💰")
-        elif event_type == "trap":
-            damage = random.randint(5, 15)
-            player.hp = max(0, player.hp - damage)
-            print(Fore.RED + f"Random Event: A hidden trap triggers! You take {damage} damage! ⚠️")
-        elif event_type == "stat":
-            print("Random Event: A magical aura empowers you! Your stats increase slightly!")
-            player.base_attack += 1
-            player.base_defense += 1
-        elif event_type == "potion":
-            found_item = random.choice(items)
-            print(Fore.GREEN + f"Random Event: You found a {found_item.name} {found_item.emoji} on the ground!")
-            player.add_item(found_item)
-        elif event_type == "fountain":
-            heal_amount = random.randint(10, 25)
-            player.hp = min(player.max_hp, player.hp + heal_amount)
-            print(Fore.BLUE + f"Random Event: You find a healing fountain and recover {heal_amount} HP!")
-        time.sleep(2)
+class EventTable:
+    """Weighted post-battle events, drawn in O(1) with Vose's alias method.
+
+    Entry 0 is "nothing happens". register() adds an event with a weight, an
+    effect apply(player, rng) -> value and a message(value) for the game to
+    print; the alias table is rebuilt on the next draw. A draw takes one
+    uniform number: its integer part picks a column, its fraction picks the
+    column's own event or its alias.
+    """
+
+    def __init__(self, nothing_weight):
+        self.names = [None]
+        self.weights = [nothing_weight]
+        self.effects = [None]
+        self.messages = [None]
+        self.ids = {}
+        self._prob = self._alias = None
+
+    def register(self, name, weight, apply, message):
+        if name in self.ids:
+            raise ValueError(f"Event {name!r} is already registered")
+        self.ids[name] = len(self.names)
+        self.names.append(name)
+        self.weights.append(weight)
+        self.effects.append(apply)
+        self.messages.append(message)
+        self._prob = self._alias = None
+
+    def _build(self):
+        n = len(self.weights)
+        total = sum(self.weights)
+        scaled = [w * n / total for w in self.weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] += scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        self._prob, self._alias = prob, alias
+
+    def draw(self, rng=random):
+        """The ID of a random event (0 for nothing)."""
+        if self._prob is None:
+            self._build()
+        u = rng.random() * len(self._prob)
+        i = int(u)
+        return i if u - i < self._prob[i] else self._alias[i]
+
+    def preroll(self, count, rng=random):
+        """count draws at once as a list of event IDs, to hand out to players later."""
+        return [self.draw(rng) for _ in range(count)]
+
+    def preroll_array(self, count, generator):
+        """count draws as a numpy int array, from a numpy Generator (for batch simulations)."""
+        import numpy as np  # only the simulators need this
+
+        if self._prob is None:
+            self._build()
+        prob = np.array(self._prob)
+        alias = np.array(self._alias)
+        u = generator.random(count) * len(prob)
+        i = u.astype(np.int64)
+        return np.where(u - i < prob[i], i, alias[i])
+
+    def apply(self, event_id, player, rng=random):
+        """Apply a drawn event to player. Returns (name, value), or None for nothing."""
+        if event_id == 0:
+            return None
+        return self.names[event_id], self.effects[event_id](player, rng)
+
+    def roll(self, player, rng=random):
+        return self.apply(self.draw(rng), player, rng)
+
+    def message(self, name, value):
+        return self.messages[self.ids[name]](value)
+
+def _treasure(player, rng):
+    gold = rng.randint(5, 20)
+    player.gold += gold
+    return gold
+
+def _trap(player, rng):
+    damage = rng.randint(5, 15)
+    player.hp = max(0, player.hp - damage)
+    return damage
+
+def _aura(player, rng):
+    player.base_attack += 1
+    player.base_defense += 1
+    player.refresh_stats()
+
+def _found_potion(player, rng):
+    item = rng.choice(items)
+    player.add_item(item)
+    return item
+
+def _fountain(player, rng):
+    heal = rng.randint(10, 25)
+    player.hp = min(player.max_hp, player.hp + heal)
+    return heal
+
+# 20% chance of an event after a battle, the five events equally likely
+EVENTS = EventTable(nothing_weight=20)
+EVENTS.register("gold", 1, _treasure,
+                lambda gold: Fore.GREEN + f"Random Event: You discovered a treasure chest with {gold} gold! 💰")
+EVENTS.register("trap", 1, _trap,
+                lambda damage: Fore.RED + f"Random Event: A hidden trap triggers! You take {damage} damage! ⚠️")
+EVENTS.register("stat", 1, _aura,
+                lambda _: "Random Event: A magical aura empowers you! Your stats increase slightly!")
+EVENTS.register("potion", 1, _found_potion,
+                lambda item: Fore.GREEN + f"Random Event: You found a {item.name} {item.emoji} on the ground!")
+EVENTS.register("fountain", 1, _fountain,
+                lambda heal: Fore.BLUE + f"Random Event: You find a healing fountain and recover {heal} HP!")
+
+def roll_random_event(player, rng=random):
+    """Roll and apply the post-battle random event without any output.
+
+    Returns (event_type, value) where value is the gold, damage, Item or heal
+    amount involved, or None if no event happened.
+    """
+    return EVENTS.roll(player, rng)
+
+def random_event(player, rng=random):
+    event = roll_random_event(player, rng)
+    if event is None:
+        return
+    clear_screen()
+    print(EVENTS.message(*event))
+    pause(2)
 
 # ----------------------------
-# Battle Function with New Abilities & Status Effects
+# Decision Policies
 # ----------------------------
 
-def battle(player, enemy):
-    clear_screen()
-    print(Fore.MAGENTA + f"A wild {enemy.name} {enemy.emoji} appears!")
-    time.sleep(1)
-    battle_log = []
+class Policy:
+    """Makes the player's decisions for run_battle() and play_run().
+
+    Combat hooks: use_special / use_class_ability are asked only when the move
+    is ready, choose_item only when HP is below 30% and the inventory is not
+    empty (return an inventory item name or None). Between battles the base
+    class levels up and shops unless told not to.
+    """
+
+    def __init__(self, level_up=True, shop=True):
+        self.level_up = level_up
+        self.shop = shop
+
+    def seed(self, seed):
+        """Reseed any randomness the policy has of its own (play_run does this per run)."""
+
+    def use_special(self, player, enemy):
+        return False
+
+    def use_class_ability(self, player, enemy):
+        return False
+
+    def choose_item(self, player, enemy):
+        return None
+
+    def wants_level_up(self, player):
+        return self.level_up
+
+    def go_shopping(self, player):
+        if not self.shop:
+            return
+        # Gear is free to equip, so take the best; spend gold on Health Potions (up to 3)
+        player.equip_weapon(max(weapons, key=lambda w: w.bonus_attack))
+        player.equip_armor(max(armors, key=lambda a: a.bonus_defense))
+        potion = items[0]
+        while player.gold >= potion.cost and player.inventory.get(potion.name, {}).get('quantity', 0) < 3:
+            player.gold -= potion.cost
+            player.add_item(potion)
+
+class HumanPolicy(Policy):
+    """Asks the player at the keyboard for every combat decision."""
+
+    def use_special(self, player, enemy):
+        choice = input(Fore.RED + "Your special meter is full! Use special ability? (y/n): ")
+        return choice.lower() == "y"
+
+    def use_class_ability(self, player, enemy):
+        choice = input(Fore.RED + "Your class ability is ready! Use it? (y/n): ")
+        return choice.lower() == "y"
+
+    def choose_item(self, player, enemy):
+        print(Fore.GREEN + "Your HP is low. Do you want to use an item? (y/n)")
+        if input().lower() != "y":
+            return None
+        item_name = player.prompt_item()
+        if item_name is None:
+            pause(1)
+        return item_name
+
+class GreedyPolicy(Policy):
+    """Fires every ability as soon as it is ready and drinks the strongest potion when low."""
+
+    def use_special(self, player, enemy):
+        return True
+
+    def use_class_ability(self, player, enemy):
+        return True
+
+    def choose_item(self, player, enemy):
+        return max(player.inventory, key=lambda name: player.inventory[name]['item'].effect)
+
+class ThresholdPolicy(Policy):
+    """Spends moves and potions only past fixed thresholds.
+
+    The special and class ability are held back once the enemy is below the
+    given fraction of its max HP (a normal hit will usually finish it), and a
+    potion is drunk below potion_hp of max HP, picking the smallest one that
+    covers the missing HP.
+    """
+
+    def __init__(self, special_enemy_hp=0.25, ability_enemy_hp=0.1, potion_hp=0.2, level_up=True, shop=True):
+        super().__init__(level_up, shop)
+        self.special_enemy_hp = special_enemy_hp
+        self.ability_enemy_hp = ability_enemy_hp
+        self.potion_hp = potion_hp
+
+    def use_special(self, player, enemy):
+        return enemy.hp >= self.special_enemy_hp * enemy.max_hp
+
+    def use_class_ability(self, player, enemy):
+        return enemy.hp >= self.ability_enemy_hp * enemy.max_hp
+
+    def choose_item(self, player, enemy):
+        if player.hp >= self.potion_hp * player.max_hp:
+            return None
+        missing = player.max_hp - player.hp
+        potions = [(info['item'].effect, name) for name, info in player.inventory.items()]
+        covering = [potion for potion in potions if potion[0] >= missing]
+        return min(covering)[1] if covering else max(potions)[1]
+
+class RandomPolicy(Policy):
+    """Flips a coin for every decision, using its own generator so it never shifts the battle's dice."""
+
+    def __init__(self, p=0.5, seed=None, level_up=True, shop=True):
+        super().__init__(level_up, shop)
+        self.p = p
+        self.rng = random.Random(seed)
+
+    def seed(self, seed):
+        self.rng.seed(seed)
+
+    def use_special(self, player, enemy):
+        return self.rng.random() < self.p
+
+    def use_class_ability(self, player, enemy):
+        return self.rng.random() < self.p
+
+    def choose_item(self, player, enemy):
+        if self.rng.random() < self.p:
+            return self.rng.choice(list(player.inventory))
+        return None
+
+POLICIES = {
+    "greedy": GreedyPolicy,
+    "threshold": ThresholdPolicy,
+    "random": RandomPolicy,
+}
+
+# ----------------------------
+# Battle Engine (combat rules only, no terminal I/O)
+# ----------------------------
+
+# Events passed to the on_event callback of run_battle(), followed by their data
+EV_APPEAR = 0         # ()
+EV_ROUND = 1          # ()
+EV_SPECIAL = 2        # (damage,)
+EV_CLASS_ABILITY = 3  # (damage,)
+EV_ATTACK = 4         # (damage, critical, combo_bonus)
+EV_ITEM = 5           # (item,)
+EV_BURN = 6           # (damage,)
+EV_STUNNED = 7        # ()
+EV_ENEMY_HEAL = 8     # (heal_amount,)
+EV_ENEMY_ATTACK = 9   # (damage, critical)
+EV_DEFEATED = 10      # (cause,) where cause is one of the player/burn events above
+
+class BattleResult:
+    def __init__(self, won, rounds, player_hp, enemy_hp):
+        self.won = won
+        self.rounds = rounds
+        self.player_hp = player_hp
+        self.enemy_hp = enemy_hp
+
+    def __repr__(self):
+        return f"BattleResult(won={self.won}, rounds={self.rounds}, player_hp={self.player_hp}, enemy_hp={self.enemy_hp})"
+
+def run_battle(player, enemy, policy, rng=random, on_event=None):
+    """Fight until one side drops, mutating player and enemy in place.
+
+    policy makes the special / class ability / item decisions, rng supplies the
+    dice rolls (anything with a random() method) and on_event, if given, is
+    called as on_event(event, *data) for every EV_* event in order.
+    """
+    emit = on_event
+    roll = rng.random
+    use_special = policy.use_special
+    use_class_ability = policy.use_class_ability
+    choose_item = policy.choose_item
+    rounds = 0
+    if emit:
+        emit(EV_APPEAR)
     while player.hp > 0 and enemy.hp > 0:
-        clear_screen()
-        print(f"{player.name} {player.emoji}: HP {Fore.GREEN}{player.hp}/{player.max_hp} | Special: {player.special_meter}/100 | Combo: {player.combo_meter} | Ability Cooldown: {player.ability_cooldown}")
-        print(f"{enemy.name} {enemy.emoji}: HP {Fore.RED}{enemy.hp}/{enemy.max_hp}")
-        print("\nBattle in progress...\n")
-        time.sleep(0.5)
-        
+        rounds += 1
+        if emit:
+            emit(EV_ROUND)
+
         # --- Player's Turn ---
-        # Offer to use special ability if meter is full
-        if player.special_meter >= 100:
-            choice = input(Fore.RED + "Your special meter is full! Use special ability? (y/n): ")
-            if choice.lower() == "y":
-                used = player.use_special_ability(enemy)
-                battle_log.append("Special ability used!")
-                if enemy.hp <= 0:
-                    print(Fore.GREEN + f"{enemy.name} is defeated by your special move!")
-                    break
-                time.sleep(1)
-                # Decrement ability cooldown if active
-                if player.ability_cooldown > 0:
-                    player.ability_cooldown -= 1
-                continue  # Skip normal attack this turn
-
-        # If class ability is ready, offer its use
-        if player.ability_cooldown == 0:
-            choice = input(Fore.RED + "Your class ability is ready! Use it? (y/n): ")
-            if choice.lower() == "y":
-                used = player.use_class_ability(enemy)
-                battle_log.append("Class ability used!")
-                if enemy.hp <= 0:
-                    print(Fore.GREEN + f"{enemy.name} is defeated by your class ability!")
-                    break
-                time.sleep(1)
-                # Skip normal attack this turn
-                if player.ability_cooldown > 0:
-                    player.ability_cooldown -= 1
-                continue
+        # Special ability and class ability replace the normal attack and enemy turn
+        if player.special_meter >= 100 and use_special(player, enemy):
+            damage = player.use_special_ability(enemy)
+            if emit:
+                emit(EV_SPECIAL, damage)
+            if enemy.hp <= 0:
+                if emit:
+                    emit(EV_DEFEATED, EV_SPECIAL)
+                break
+            if player.ability_cooldown > 0:
+                player.ability_cooldown -= 1
+            continue
+
+        if player.ability_cooldown == 0 and use_class_ability(player, enemy):
+            damage = player.use_class_ability(enemy)
+            if emit:
+                emit(EV_CLASS_ABILITY, damage)
+            if enemy.hp <= 0:
+                if emit:
+                    emit(EV_DEFEATED, EV_CLASS_ABILITY)
+                break
+            if player.ability_cooldown > 0:
+                player.ability_cooldown -= 1
+            continue
 
         # Normal attack
-        p_attack = player.total_attack()
-        base_damage = max(0, p_attack - enemy.defense)
+        base_damage = max(0, player.total_attack() - enemy.defense)
         damage = base_damage
 
         # Chance for critical hit
-        critical = False
-        if random.random() < 0.1:
+        critical = roll() < 0.1
+        if critical:
             damage *= 2
-            critical = True
 
+        bonus = 0
         if damage > 0:
             player.combo_meter += 1
             # Every 3 consecutive hits add bonus damage
             if player.combo_meter >= 3:
                 bonus = int(0.5 * base_damage)
                 damage += bonus
-                battle_log.append(f"Combo bonus! +{bonus} damage.")
                 player.combo_meter = 0
         else:
             player.combo_meter = 0
@@ -523,99 +1088,181 @@ def battle(player, enemy):
         enemy.hp -= damage
         # Increase special meter slightly with every hit
         player.special_meter = min(100, player.special_meter + 10)
-        effect = Fore.YELLOW + "💥" if damage > 0 else "🌀"
-        crit_text = Fore.RED + " Critical Hit!" if critical else ""
-        print(f"{player.name} attacks with {player.weapon.emoji if player.weapon else 'bare hands'} {effect}{crit_text} for {damage} damage!")
-        battle_log.append(f"Player dealt {damage} damage.")
-        time.sleep(1)
+        if emit:
+            emit(EV_ATTACK, damage, critical, bonus)
         if enemy.hp <= 0:
-            print(Fore.GREEN + f"{enemy.name} is defeated!")
-            battle_log.append("Enemy defeated.")
+            if emit:
+                emit(EV_DEFEATED, EV_ATTACK)
             break
 
-        # --- Check for Low HP and Offer to Use Item ---
+        # --- Low HP: the policy may drink a potion ---
         if player.hp < 0.3 * player.max_hp and player.inventory:
-            print(Fore.GREEN + "Your HP is low. Do you want to use an item? (y/n)")
-            if input().lower() == "y":
-                player.use_item()
-                time.sleep(1)
-        
+            item_name = choose_item(player, enemy)
+            if item_name is not None:
+                item = player.consume_item(item_name)
+                if emit:
+                    emit(EV_ITEM, item)
+
         # --- Enemy's Turn ---
         # Apply burn damage if enemy is burned
-        if "burn" in enemy.status_effects and enemy.status_effects["burn"] > 0:
+        if enemy.burn > 0:
             burn_damage = int(0.05 * enemy.max_hp)
             enemy.hp -= burn_damage
-            print(Fore.CYAN + f"{enemy.name} suffers {burn_damage} burn damage!")
-            battle_log.append("Enemy burned for damage.")
-            enemy.status_effects["burn"] -= 1
+            enemy.burn -= 1
+            if emit:
+                emit(EV_BURN, burn_damage)
             if enemy.hp <= 0:
-                print(Fore.GREEN + f"{enemy.name} succumbs to the burn!")
+                if emit:
+                    emit(EV_DEFEATED, EV_BURN)
                 break
-        
+
         # Check if enemy is stunned
-        if "stunned" in enemy.status_effects and enemy.status_effects["stunned"] > 0:
-            print(Fore.CYAN + f"{enemy.name} is stunned and cannot act!")
-            battle_log.append("Enemy stunned, turn skipped.")
-            enemy.status_effects["stunned"] -= 1
+        if enemy.stunned > 0:
+            enemy.stunned -= 1
+            if emit:
+                emit(EV_STUNNED)
+        # Enemy may use a healing ability if low on HP and not used yet
+        elif enemy.hp < enemy.max_hp / 2 and not enemy.heal_used and roll() < 0.2:
+            heal_amount = int(0.1 * enemy.max_hp)
+            enemy.hp = min(enemy.max_hp, enemy.hp + heal_amount)
+            enemy.heal_used = True
+            if emit:
+                emit(EV_ENEMY_HEAL, heal_amount)
         else:
-            # Enemy may use a healing ability if low on HP and not used yet
-            if enemy.hp < enemy.max_hp / 2 and not enemy.heal_used and random.random() < 0.2:
-                heal_amount = int(0.1 * enemy.max_hp)
-                enemy.hp = min(enemy.max_hp, enemy.hp + heal_amount)
-                enemy.heal_used = True
-                print(Fore.CYAN + f"{enemy.name} uses a healing ability and recovers {heal_amount} HP!")
-                battle_log.append("Enemy healed.")
-                time.sleep(1)
-            else:
-                # Enemy attacks
-                enemy_attack = enemy.attack
-                enemy_critical = False
-                if random.random() < 0.1:
-                    enemy_attack *= 2
-                    enemy_critical = True
-                damage = max(0, enemy_attack - player.total_defense())
-                player.hp -= damage
-                effect = Fore.MAGENTA + "🔥" if damage > 0 else "💨"
-                crit_text = Fore.RED + " Critical Hit!" if enemy_critical else ""
-                print(f"{enemy.name} attacks {player.name} {effect}{crit_text} for {damage} damage!")
-                battle_log.append(f"Enemy dealt {damage} damage.")
-                time.sleep(1)
+            # Enemy attacks with a chance for critical hit
+            enemy_attack = enemy.attack
+            enemy_critical = roll() < 0.1
+            if enemy_critical:
+                enemy_attack *= 2
+            damage = max(0, enemy_attack - player.total_defense())
+            player.hp -= damage
+            if emit:
+                emit(EV_ENEMY_ATTACK, damage, enemy_critical)
         # Decrement player's ability cooldown if active
         if player.ability_cooldown > 0:
             player.ability_cooldown -= 1
-    return player.hp > 0
+    return BattleResult(player.hp > 0, rounds, player.hp, enemy.hp)
+
+# ----------------------------
+# Battle Function (terminal renderer on top of the engine)
+# ----------------------------
+
+def battle_renderer(player, enemy):
+    """Build an on_event callback that prints the battle the way the game always has."""
+    def render(event, *data):
+        if event == EV_APPEAR:
+            clear_screen()
+            print(Fore.MAGENTA + f"A wild {enemy.name} {enemy.emoji} appears!")
+            pause(1)
+        elif event == EV_ROUND:
+            clear_screen()
+            print(f"{player.name} {player.emoji}: HP {Fore.GREEN}{player.hp}/{player.max_hp} | Special: {player.special_meter}/100 | Combo: {player.combo_meter} | Ability Cooldown: {player.ability_cooldown}")
+            print(f"{enemy.name} {enemy.emoji}: HP {Fore.RED}{enemy.hp}/{enemy.max_hp}")
+            print("\nBattle in progress...\n")
+            pause(0.5)
+        elif event == EV_SPECIAL:
+            print(Fore.RED + f"{player.name} unleashes a SPECIAL MOVE {player.weapon.emoji if player.weapon else 'fists'} for {data[0]} damage!")
+            if enemy.hp > 0:
+                pause(1)
+        elif event == EV_CLASS_ABILITY:
+            damage = data[0]
+            if player.name == "Knight":
+                print(Fore.RED + f"{player.name} uses Shield Bash, dealing {damage} damage and stunning the enemy!")
+            elif player.name == "Wizard":
+                print(Fore.RED + f"{player.name} casts Fireball, dealing {damage} damage and burning the enemy!")
+            elif player.name == "Rogue":
+                print(Fore.RED + f"{player.name} uses Double Strike for a total of {damage} damage!")
+            if enemy.hp > 0:
+                pause(1)
+        elif event == EV_ATTACK:
+            damage, critical, bonus = data
+            effect = Fore.YELLOW + "💥" if damage > 0 else "🌀"
+            crit_text = Fore.RED + " Critical Hit!" if critical else ""
+            print(f"{player.name} attacks with {player.weapon.emoji if player.weapon else 'bare hands'} {effect}{crit_text} for {damage} damage!")
+            pause(1)
+        elif event == EV_ITEM:
+            item = data[0]
+            print(Fore.GREEN + f"Used {item.name} {item.emoji}. Restored {item.effect} HP!")
+            pause(1)
+        elif event == EV_BURN:
+            print(Fore.CYAN + f"{enemy.name} suffers {data[0]} burn damage!")
+        elif event == EV_STUNNED:
+            print(Fore.CYAN + f"{enemy.name} is stunned and cannot act!")
+        elif event == EV_ENEMY_HEAL:
+            print(Fore.CYAN + f"{enemy.name} uses a healing ability and recovers {data[0]} HP!")
+            pause(1)
+        elif event == EV_ENEMY_ATTACK:
+            damage, critical = data
+            effect = Fore.MAGENTA + "🔥" if damage > 0 else "💨"
+            crit_text = Fore.RED + " Critical Hit!" if critical else ""
+            print(f"{enemy.name} attacks {player.name} {effect}{crit_text} for {damage} damage!")
+            pause(1)
+        elif event == EV_DEFEATED:
+            cause = data[0]
+            if cause == EV_SPECIAL:
+                print(Fore.GREEN + f"{enemy.name} is defeated by your special move!")
+            elif cause == EV_CLASS_ABILITY:
+                print(Fore.GREEN + f"{enemy.name} is defeated by your class ability!")
+            elif cause == EV_BURN:
+                print(Fore.GREEN + f"{enemy.name} succumbs to the burn!")
+            else:
+                print(Fore.GREEN + f"{enemy.name} is defeated!")
+    return render
+
+record_path = None  # file battle() appends a replay record of each battle to (--record)
+
+def battle(player, enemy, policy=None, rng=random):
+    if policy is None:
+        # Skipping goes straight to the result, so nobody is asked: abilities and potions are used greedily
+        policy = GreedyPolicy() if clock.skipping else HumanPolicy()
+    on_event = battle_renderer(player, enemy)
+    if record_path:
+        # The battle rolls its own seeded dice, so the record can replay it
+        from autobattle_replay import BattleRecorder, tee, write_records  # it imports this module
+        seed = rng.getrandbits(64)
+        rng = random.Random(seed)
+        recorder = BattleRecorder(player, enemy, seed)
+        on_event = tee(on_event, recorder.emit)
+    result = run_battle(player, enemy, policy, rng, on_event)
+    if record_path:
+        write_records(record_path, [recorder.getvalue()])
+    return result.won
 
 # ----------------------------
 # Main Game Loop and Game Over
 # ----------------------------
 
-def game_loop(player):
-    battle_number = 1
+def game_loop(player, rng=random):
+    battle_number = player.battles_won + 1
     while player.hp > 0:
-        enemy = create_enemy(battle_number)
-        won = battle(player, enemy)
+        enemy = create_enemy(battle_number, rng)
+        with clock.battle():
+            won = battle(player, enemy, rng=rng)
         if not won:
             break
         player.battles_won += 1
         clear_screen()
         print(Fore.GREEN + "Battle won!")
         # Award gold for victory
-        gold_reward = random.randint(10, 30)
+        gold_reward = rng.randint(10, 30)
         player.gold += gold_reward
         print(f"You earned {gold_reward} gold!")
-        time.sleep(1)
+        pause(1)
         # Trigger a random event
-        random_event(player)
+        random_event(player, rng)
+        if player.hp <= 0:
+            break  # killed by a trap: no level up, shop or save for a fallen hero
         # Prompt for leveling up
         print("Do you want to level up your character? (y/n)")
         if input().lower() == "y":
             player.level_up()
             print("Level Up! Your stats have increased!")
-            time.sleep(1)
+            pause(1)
         # Option to visit the shop for new gear or items
         print("Do you want to visit the shop? (y/n)")
         if input().lower() == "y":
             shop_menu(player)
+        autosave(player)
         # Option to save game progress after each battle
         print("Do you want to save your progress? (y/n)")
         if input().lower() == "y":
@@ -626,18 +1273,94 @@ def game_loop(player):
     print(Fore.RED + "=== Game Over ===")
     print(f"You won {player.battles_won} battles before falling in combat.")
     highscore = load_high_score()
+    record_run(player)
+    # The run is scored once: its slot (last autosaved before the fatal battle) must not resume it
+    save_store.delete(save_slot)
     if player.battles_won > highscore:
         print(Fore.YELLOW + "New High Score!")
-        save_high_score(player.battles_won)
         highscore = player.battles_won
     print(f"High Score: {highscore}")
+    print(f"\nBest {player.name} runs at difficulty {DIFFICULTY}:")
+    for rank, (battles_won, _) in enumerate(leaderboard.top(player.name, DIFFICULTY, 5), 1):
+        print(f"{rank}. {battles_won} battles won")
     input("Press Enter to return to the main menu...")
 
+# ----------------------------
+# Headless Game Loop (for simulations)
+# ----------------------------
+
+class RunResult:
+    def __init__(self):
+        self.battles_won = 0
+        self.fell_at = None      # battle_number the run ended at, None if the run hit max_battles
+        self.trap_death = False  # True if a trap killed the player after winning battle fell_at, not the battle
+        self.gold_earned = 0     # battle rewards plus treasure events
+        self.gold_spent = 0
+        self.final_gold = 0
+
+def play_run(player, policy, max_battles=100, seed=None, record=None, difficulty=None):
+    """Play game_loop() without I/O until the player falls or max_battles are won.
+
+    Without a seed the global random module is used. With one, the run draws
+    enemies, gold and events from its own stream and every battle rolls its
+    dice from a stream of its own (derive_seed(seed, "battle", n)), so a
+    different decision in one battle never shifts the draws of the others.
+    With record, a callback, it is passed each battle's autobattle_replay record.
+    difficulty defaults to the game's current DIFFICULTY.
+    """
+    if seed is None:
+        rng = random
+    else:
+        rng = random.Random(derive_seed(seed, "run"))
+        policy.seed(derive_seed(seed, "policy"))
+    recorder = None
+    if record is not None:
+        from autobattle_replay import BattleRecorder  # it imports this module
+        recorder = BattleRecorder()
+    result = RunResult()
+    battle_number = 1
+    while player.hp > 0 and battle_number <= max_battles:
+        enemy = create_enemy(battle_number, rng, difficulty)
+        if recorder is None:
+            dice = rng if seed is None else random.Random(derive_seed(seed, "battle", battle_number))
+            won = run_battle(player, enemy, policy, dice).won
+        else:
+            # A record replays from its battle's own seed, so unseeded runs draw one
+            battle_seed = rng.getrandbits(64) if seed is None else derive_seed(seed, "battle", battle_number)
+            recorder.start(player, enemy, battle_seed)
+            won = run_battle(player, enemy, policy, random.Random(battle_seed), recorder.emit).won
+            record(recorder.getvalue())
+        if not won:
+            result.fell_at = battle_number
+            break
+        player.battles_won += 1
+        gold_reward = rng.randint(10, 30)
+        player.gold += gold_reward
+        result.gold_earned += gold_reward
+        gold_before = player.gold
+        roll_random_event(player, rng)
+        result.gold_earned += player.gold - gold_before
+        if player.hp <= 0:
+            # Killed by a trap: as in game_loop(), no level up or shop for a fallen hero
+            result.fell_at = battle_number
+            result.trap_death = True
+            break
+        if policy.wants_level_up(player):
+            player.level_up()
+        gold_before = player.gold
+        policy.go_shopping(player)
+        result.gold_spent += gold_before - player.gold
+        battle_number += 1
+    result.battles_won = player.battles_won
+    result.final_gold = player.gold
+    return result
+
 # ----------------------------
 # Start Game and Main Menu
 # ----------------------------
 
 def start_game(new=True):
+    global save_slot
     if new:
         game_intro()
         player = choose_character()
@@ -646,8 +1369,19 @@ def start_game(new=True):
             player.equip_weapon(weapons[0])
         if not player.armor:
             player.equip_armor(armors[0])
+        while True:
+            save_slot = choose_slot("Choose a Save Slot")
+            existing = save_store.load(save_slot)
+            if existing is None:
+                break
+            print(Fore.YELLOW + f"Slot {save_slot} holds {existing['name']} with {existing['battles_won']} battles won. "
+                  "Overwrite it? (y/n)")
+            if input().lower() == "y":
+                break
+        save_store.save(save_slot, character_state(player))
     else:
-        player = load_game()
+        save_slot = choose_slot("Load Game")
+        player = load_game(save_slot)
         if player is None:
             return
     game_loop(player)
@@ -675,7 +1409,16 @@ def main_menu():
             break
         else:
             print("Invalid choice. Try again.")
-            time.sleep(1)
+            pause(1)
 
 if __name__ == "__main__":
-    main_menu()
+    parser = argparse.ArgumentParser(description="Dungeon Auto Battler")
+    parser.add_argument("--speed", choices=list(SPEEDS), default="1x",
+                        help="game speed; skip also jumps every battle straight to its result")
+    parser.add_argument("--record", metavar="PATH",
+                        help="append a replayable record of every battle to this file (see autobattle_replay.py)")
+    args = parser.parse_args()
+    clock.set_speed(args.speed)
+    record_path = args.record
+    with screen.attach():
+        main_menu()
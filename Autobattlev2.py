@@ -1,15 +1,25 @@
+import argparse
 import random
-import time
-import os
 import json
 from colorama import init, Fore, Style
 
+from autobattle_term import SPEEDS, Clock, Screen
+
 # Initialize colorama for colored terminal output
 init(autoreset=True)
 
+screen = Screen(autoreset=True)
+clock = Clock()
+
 # Utility function to clear the screen
 def clear_screen():
-    os.system('cls' if os.name == 'nt' else 'clear')
+    screen.clear()
+
+# Show what has been printed so far, then wait (scaled by the game speed)
+def pause(seconds):
+    if not clock.skipping:
+        screen.present()
+    clock.wait(seconds)
 
 # ----------------------------
 # Data Classes
@@ -44,6 +54,9 @@ class Item:
         return f"{self.name} {self.emoji} (Restores {self.effect} HP, Cost: {self.cost} gold)"
 
 class Character:
+    __slots__ = ("name", "max_hp", "hp", "base_attack", "base_defense", "weapon", "armor",
+                 "level", "emoji", "gold", "battles_won", "inventory", "special_meter", "combo_meter")
+
     def __init__(self, name, hp, base_attack, base_defense, emoji):
         self.name = name
         self.max_hp = hp
@@ -89,7 +102,8 @@ class Character:
         else:
             self.inventory[item.name] = {'item': item, 'quantity': quantity}
 
-    def use_item(self):
+    def use_item(self, choice=None):
+        """Drink a potion: choice is its number in the inventory list (None: ask)."""
         if not self.inventory:
             print(Fore.YELLOW + "You have no items in your inventory!")
             return False
@@ -97,7 +111,8 @@ class Character:
         for idx, (item_name, info) in enumerate(self.inventory.items(), 1):
             print(f"{idx}. {info['item']} x{info['quantity']}")
         try:
-            choice = int(input("Choose an item to use (0 to cancel): "))
+            if choice is None:
+                choice = int(input("Choose an item to use (0 to cancel): "))
             if choice == 0:
                 return False
             if 1 <= choice <= len(self.inventory):
@@ -129,6 +144,8 @@ class Character:
         return False
 
 class Enemy:
+    __slots__ = ("name", "max_hp", "hp", "attack", "defense", "emoji", "is_boss", "heal_used")
+
     def __init__(self, name, hp, attack, defense, emoji, is_boss=False):
         self.name = name
         self.max_hp = hp
@@ -188,7 +205,7 @@ def save_game(player):
     with open(SAVE_FILE, "w") as f:
         json.dump(data, f)
     print(Fore.GREEN + "Game saved!")
-    time.sleep(1)
+    pause(1)
 
 def load_game():
     try:
@@ -218,11 +235,11 @@ def load_game():
                     player.inventory[item_name] = {'item': itm, 'quantity': qty}
                     break
         print(Fore.GREEN + "Game loaded successfully!")
-        time.sleep(1)
+        pause(1)
         return player
     except Exception as e:
         print(Fore.RED + f"Failed to load game: {e}")
-        time.sleep(1)
+        pause(1)
         return None
 
 # ----------------------------
@@ -288,7 +305,7 @@ def shop_menu(player):
                     print("Invalid choice.")
             except ValueError:
                 print("Please enter a number.")
-            time.sleep(1)
+            pause(1)
         elif choice == "2":
             clear_screen()
             print("Available Armors:")
@@ -303,7 +320,7 @@ def shop_menu(player):
                     print("Invalid choice.")
             except ValueError:
                 print("Please enter a number.")
-            time.sleep(1)
+            pause(1)
         elif choice == "3":
             clear_screen()
             print("Available Items:")
@@ -323,47 +340,47 @@ def shop_menu(player):
                     print("Invalid choice.")
             except ValueError:
                 print("Please enter a number.")
-            time.sleep(1)
+            pause(1)
         elif choice == "4":
             save_game(player)
         elif choice == "5":
             break
         else:
             print("Invalid choice. Try again.")
-            time.sleep(1)
+            pause(1)
 
 # ----------------------------
 # Enemy Creation and Random Events
 # ----------------------------
 
-def create_enemy(battle_number):
+def create_enemy(battle_number, rng=random):
     # Every 10th battle is a boss battle
     is_boss = (battle_number % 10 == 0)
     if is_boss:
-        name = "Boss " + random.choice(["Goblin King", "Orc Warlord", "Dragon", "Lich"])
+        name = "Boss " + rng.choice(["Goblin King", "Orc Warlord", "Dragon", "Lich"])
         hp = 100 + battle_number * 5
         attack = 15 + battle_number
         defense = 10 + battle_number // 2
         emoji = "👹"
     else:
-        name = random.choice(["Goblin", "Orc", "Skeleton", "Zombie"])
+        name = rng.choice(["Goblin", "Orc", "Skeleton", "Zombie"])
         hp = 50 + battle_number * 3
         attack = 10 + battle_number // 2
         defense = 5 + battle_number // 3
-        emoji = random.choice(["👾", "💀", "🧟", "👹"])
+        emoji = rng.choice(["👾", "💀", "🧟", "👹"])
     return Enemy(name, hp, attack, defense, emoji, is_boss)
 
-def random_event(player):
+def random_event(player, rng=random):
     # 20% chance for a random event after battle
-    if random.random() < 0.2:
+    if rng.random() < 0.2:
         clear_screen()
-        event_type = random.choice(["gold", "trap", "stat", "potion", "fountain"])
+        event_type = rng.choice(["gold", "trap", "stat", "potion", "fountain"])
         if event_type == "gold":
-            gold_found = random.randint(5, 20)
+            gold_found = rng.randint(5, 20)
             player.gold += gold_found
             print(Fore.GREEN + f"Random Event: You discovered a treasure chest with {gold_found} gold! 💰")
         elif event_type == "trap":
-            damage = random.randint(5, 15)
+            damage = rng.randint(5, 15)
             player.hp = max(0, player.hp - damage)
             print(Fore.RED + f"Random Event: A hidden trap triggers! You take {damage} damage! ⚠️")
         elif event_type == "stat":
@@ -371,42 +388,46 @@ def random_event(player):
             player.base_attack += 1
             player.base_defense += 1
         elif event_type == "potion":
-            found_item = random.choice(items)
+            found_item = rng.choice(items)
             print(Fore.GREEN + f"Random Event: You found a {found_item.name} {found_item.emoji} on the ground!")
             player.add_item(found_item)
         elif event_type == "fountain":
-            heal_amount = random.randint(10, 25)
+            heal_amount = rng.randint(10, 25)
             player.hp = min(player.max_hp, player.hp + heal_amount)
             print(Fore.BLUE + f"Random Event: You find a healing fountain and recover {heal_amount} HP!")
-        time.sleep(2)
+        pause(2)
 
 # ----------------------------
 # Battle Function with Enhancements
 # ----------------------------
 
-def battle(player, enemy):
+def battle(player, enemy, rng=random):
     clear_screen()
     print(Fore.MAGENTA + f"A wild {enemy.name} {enemy.emoji} appears!")
-    time.sleep(1)
+    pause(1)
     battle_log = []
     while player.hp > 0 and enemy.hp > 0:
         clear_screen()
         print(f"{player.name} {player.emoji}: HP {Fore.GREEN}{player.hp}/{player.max_hp} | Special: {player.special_meter}/100 | Combo: {player.combo_meter}")
         print(f"{enemy.name} {enemy.emoji}: HP {Fore.RED}{enemy.hp}/{enemy.max_hp}")
         print("\nBattle in progress...\n")
-        time.sleep(0.5)
+        pause(0.5)
         
         # --- Player's Turn ---
         # Offer special ability if meter is full
+        # When skipping, the battle plays itself: abilities fire as soon as they are ready
         if player.special_meter >= 100:
-            choice = input(Fore.RED + "Your special meter is full! Use special ability? (y/n): ")
+            if clock.skipping:
+                choice = "y"
+            else:
+                choice = input(Fore.RED + "Your special meter is full! Use special ability? (y/n): ")
             if choice.lower() == "y":
                 used = player.use_special_ability(enemy)
                 battle_log.append("Special ability used!")
                 if enemy.hp <= 0:
                     print(Fore.GREEN + f"{enemy.name} is defeated by your special move!")
                     break
-                time.sleep(1)
+                pause(1)
                 continue  # Skip normal attack this turn
         
         # Normal attack
@@ -416,7 +437,7 @@ def battle(player, enemy):
         
         # Chance for critical hit
         critical = False
-        if random.random() < 0.1:
+        if rng.random() < 0.1:
             damage *= 2
             critical = True
         
@@ -439,7 +460,7 @@ def battle(player, enemy):
         crit_text = Fore.RED + " Critical Hit!" if critical else ""
         print(f"{player.name} attacks with {player.weapon.emoji if player.weapon else 'bare hands'} {effect}{crit_text} for {damage} damage!")
         battle_log.append(f"Player dealt {damage} damage.")
-        time.sleep(1)
+        pause(1)
         if enemy.hp <= 0:
             print(Fore.GREEN + f"{enemy.name} is defeated!")
             battle_log.append("Enemy defeated.")
@@ -447,25 +468,30 @@ def battle(player, enemy):
 
         # --- Check for Low HP and Offer to Use Item ---
         if player.hp < 0.3 * player.max_hp and player.inventory:
-            print(Fore.GREEN + "Your HP is low. Do you want to use an item? (y/n)")
-            if input().lower() == "y":
-                player.use_item()
-                time.sleep(1)
+            if clock.skipping:
+                # ...and the strongest potion is drunk
+                potions = [info['item'].effect for info in player.inventory.values()]
+                player.use_item(potions.index(max(potions)) + 1)
+            else:
+                print(Fore.GREEN + "Your HP is low. Do you want to use an item? (y/n)")
+                if input().lower() == "y":
+                    player.use_item()
+                    pause(1)
         
         # --- Enemy's Turn ---
         # Enemy special: Heal themselves if low on HP and not used yet
-        if enemy.hp < enemy.max_hp/2 and not enemy.heal_used and random.random() < 0.2:
+        if enemy.hp < enemy.max_hp/2 and not enemy.heal_used and rng.random() < 0.2:
             heal_amount = int(0.1 * enemy.max_hp)
             enemy.hp = min(enemy.max_hp, enemy.hp + heal_amount)
             enemy.heal_used = True
             print(Fore.CYAN + f"{enemy.name} uses a healing ability and recovers {heal_amount} HP!")
             battle_log.append("Enemy healed.")
-            time.sleep(1)
+            pause(1)
         else:
             # Enemy attack with a chance for critical hit
             enemy_attack = enemy.attack
             enemy_critical = False
-            if random.random() < 0.1:
+            if rng.random() < 0.1:
                 enemy_attack *= 2
                 enemy_critical = True
             damage = max(0, enemy_attack - player.total_defense())
@@ -474,36 +500,44 @@ def battle(player, enemy):
             crit_text = Fore.RED + " Critical Hit!" if enemy_critical else ""
             print(f"{enemy.name} attacks {player.name} {effect}{crit_text} for {damage} damage!")
             battle_log.append(f"Enemy dealt {damage} damage.")
-            time.sleep(1)
+            pause(1)
     return player.hp > 0
 
 # ----------------------------
 # Main Game Loop and Game Over
 # ----------------------------
 
-def game_loop(player):
+seed = None  # --seed: every game draws the same run
+
+def game_loop(player, seed=None):
+    # With a seed, enemies, gold and events come from one stream and every
+    # battle rolls its dice from a stream of its own, as AutobattleV3.play_run()
+    # does, so a different choice in one battle never shifts the others
+    rng = random if seed is None else random.Random(f"{seed}:run")
     battle_number = 1
     while player.hp > 0:
-        enemy = create_enemy(battle_number)
-        won = battle(player, enemy)
+        enemy = create_enemy(battle_number, rng)
+        dice = rng if seed is None else random.Random(f"{seed}:battle:{battle_number}")
+        with clock.battle():
+            won = battle(player, enemy, rng=dice)
         if not won:
             break
         player.battles_won += 1
         clear_screen()
         print(Fore.GREEN + "Battle won!")
         # Award gold for victory
-        gold_reward = random.randint(10, 30)
+        gold_reward = rng.randint(10, 30)
         player.gold += gold_reward
         print(f"You earned {gold_reward} gold!")
-        time.sleep(1)
+        pause(1)
         # Trigger a random event
-        random_event(player)
+        random_event(player, rng)
         # Prompt for leveling up
         print("Do you want to level up your character? (y/n)")
         if input().lower() == "y":
             player.level_up()
             print("Level Up! Your stats have increased!")
-            time.sleep(1)
+            pause(1)
         # Option to visit the shop for new gear or items
         print("Do you want to visit the shop? (y/n)")
         if input().lower() == "y":
@@ -557,7 +591,7 @@ def start_game(new=True):
         player = load_game()
         if player is None:
             return
-    game_loop(player)
+    game_loop(player, seed)
 
 def main_menu():
     while True:
@@ -582,7 +616,15 @@ def main_menu():
             break
         else:
             print("Invalid choice. Try again.")
-            time.sleep(1)
+            pause(1)
 
 if __name__ == "__main__":
-    main_menu()
+    parser = argparse.ArgumentParser(description="Dungeon Auto Battler")
+    parser.add_argument("--speed", choices=list(SPEEDS), default="1x",
+                        help="game speed; skip also jumps every battle straight to its result")
+    parser.add_argument("--seed", help="replay the same enemies, dice, gold and events in every game")
+    args = parser.parse_args()
+    clock.set_speed(args.speed)
+    seed = args.seed
+    with screen.attach():
+        main_menu()
@@ -2,12 +2,44 @@ import random
 import sys
 from time import sleep
 
+MAX_HEALTH = 50
+
+# ----------------------------
+# Effect Descriptors
+# ----------------------------
+# A card's effects are plain (kind, amount, turns, name) tuples, applied in
+# order by Player.apply_effects(). DAMAGE and DOT hit the target; ARMOR and
+# HEAL go to the player of the card. A DOT becomes a status on the target that
+# deals `amount` at the end of every turn for `turns` turns.
+
+DAMAGE, ARMOR, HEAL, DOT = range(4)
+
+def damage(amount):
+    return (DAMAGE, amount, 0, None)
+
+def armor(amount):
+    return (ARMOR, amount, 0, None)
+
+def heal(amount):
+    return (HEAL, amount, 0, None)
+
+def damage_over_time(amount, turns, name="Poison"):
+    return (DOT, amount, turns, name)
+
+def effect_totals(effects):
+    """(damage, armor, heal, damage over time) a list of effects adds up to, at most."""
+    totals = [0, 0, 0, 0]
+    for kind, amount, turns, _ in effects:
+        totals[kind] += amount * turns if kind == DOT else amount
+    return tuple(totals)
+
 class Card:
-    def __init__(self, name, cost, card_type, effect):
+    def __init__(self, name, cost, card_type, effects):
         self.name = name
         self.cost = cost
         self.card_type = card_type
-        self.effect = effect
+        self.effects = tuple(effects)
+        self.totals = effect_totals(self.effects)
 
     def __repr__(self):
         return f"""
@@ -19,9 +51,11 @@ class Card:
 """.strip()
 
 class Player:
-    def __init__(self, name, deck):
+    def __init__(self, name, deck, verbose=True, rng=random):
         self.name = name
-        self.health = 50
+        self.verbose = verbose  # False for headless matches: no output at all
+        self.rng = rng
+        self.health = MAX_HEALTH
         self.armor = 0
         self.max_mana = 0
         self.mana = 0
@@ -29,7 +63,8 @@ class Player:
         self.hand = []
         self.discard = []
         self.statuses = []
-        random.shuffle(self.deck)
+        self.cards_played = {}  # card name -> times played
+        rng.shuffle(self.deck)
 
     def draw_cards(self, num):
         for _ in range(num):
@@ -38,7 +73,7 @@ class Player:
                     return
                 self.deck = self.discard.copy()
                 self.discard = []
-                random.shuffle(self.deck)
+                self.rng.shuffle(self.deck)
             if self.deck:
                 self.hand.append(self.deck.pop())
 
@@ -47,37 +82,81 @@ class Player:
             damage_blocked = min(amount, self.armor)
             self.armor -= damage_blocked
             amount -= damage_blocked
-            print(f"✨ {self.name} blocked {damage_blocked} damage with armor!")
+            if self.verbose:
+                print(f"✨ {self.name} blocked {damage_blocked} damage with armor!")
         self.health -= amount
-        print(f"💥 {self.name} takes {amount} damage! ({self.health} HP remaining)")
+        if self.verbose:
+            print(f"💥 {self.name} takes {amount} damage! ({self.health} HP remaining)")
 
-    def add_status(self, name, duration, effect):
-        self.statuses.append({
-            "name": name,
-            "duration": duration,
-            "effect": effect
-        })
-        print(f"🌀 {self.name} gains {name} ({duration} turns)")
+    def add_status(self, name, duration, damage):
+        """A damage-over-time status: (name, damage per turn, turns left)."""
+        self.statuses.append((name, damage, duration))
+        if self.verbose:
+            print(f"🌀 {self.name} gains {name} ({duration} turns)")
 
     def process_statuses(self):
-        for status in self.statuses:
-            status["effect"](self)
-        self.statuses = [s for s in self.statuses if s["duration"] > 1]
-        for status in self.statuses:
-            status["duration"] -= 1
+        statuses = self.statuses
+        if not statuses:
+            return
+        # Armor soaks damage the same whether it comes in one hit or several
+        if self.verbose:
+            print(f"☠️ {self.name} suffers {', '.join(s[0] for s in statuses)}")
+        self.take_damage(sum(s[1] for s in statuses))
+        self.statuses = [(name, amount, turns - 1) for name, amount, turns in statuses if turns > 1]
+
+    def apply_effects(self, effects, target):
+        """Carry out a card's effect descriptors, played by this player on target."""
+        for kind, amount, turns, name in effects:
+            if kind == DAMAGE:
+                target.take_damage(amount)
+            elif kind == ARMOR:
+                self.armor += amount
+                if self.verbose:
+                    print(f"🛡️ {self.name} gains {amount} armor!")
+            elif kind == HEAL:
+                amount = min(amount, MAX_HEALTH - self.health)
+                self.health += amount
+                if self.verbose:
+                    print(f"💚 {self.name} heals {amount} HP! ({self.health} HP)")
+            else:
+                target.add_status(name, turns, amount)
+
+    def copy(self):
+        """An independent copy for search: the card lists are new, the cards and rng are shared."""
+        other = Player.__new__(Player)
+        other.__dict__.update(self.__dict__)
+        other.deck = self.deck.copy()
+        other.hand = self.hand.copy()
+        other.discard = self.discard.copy()
+        other.statuses = self.statuses.copy()
+        other.cards_played = self.cards_played.copy()
+        return other
+
+    def state_key(self):
+        """A hashable snapshot of everything that affects play from here on.
+
+        The hand and discard pile are unordered (the discard is reshuffled
+        before it is drawn from); the deck's order is kept.
+        """
+        return (self.name, self.health, self.armor, self.max_mana, self.mana,
+                tuple(card.name for card in self.deck),
+                tuple(sorted(card.name for card in self.hand)),
+                tuple(sorted(card.name for card in self.discard)),
+                tuple(sorted(self.statuses)))
 
     def start_turn(self):
         self.max_mana = min(self.max_mana + 1, 10)
         self.mana = self.max_mana
         self.armor = 0
         self.draw_cards(5)
-        print(f"\n=== {self.name}'s Turn ===")
-        self.display_status()
+        if self.verbose:
+            print(f"\n=== {self.name}'s Turn ===")
+            self.display_status()
 
     def display_status(self):
-        status_str = " | ".join([f"{s['name']}({s['duration']})" for s in self.statuses])
+        status_str = " | ".join([f"{name}({turns})" for name, _, turns in self.statuses])
         print(f"\n{self.name}")
-        print(f"Health: {self.health}/50 {'♥' * (self.health // 5)}")
+        print(f"Health: {self.health}/{MAX_HEALTH} {'♥' * (self.health // 5)}")
         print(f"Mana: {'◆' * self.mana}{'◇' * (self.max_mana - self.mana)}")
         if status_str:
             print(f"Statuses: {status_str}")
@@ -89,49 +168,103 @@ class Player:
         if card.cost > self.mana:
             return False
         self.mana -= card.cost
-        print(f"\n⚡ {self.name} plays {card.name}!")
-        card.effect(target, self)
+        if self.verbose:
+            print(f"\n⚡ {self.name} plays {card.name}!")
+        self.cards_played[card.name] = self.cards_played.get(card.name, 0) + 1
+        self.apply_effects(card.effects, target)
         self.discard.append(card)
         self.hand.remove(card)
         return True
 
 class Game:
-    def __init__(self, player1, player2):
+    def __init__(self, player1, player2, verbose=True, rng=random, max_turns=None, strategies=None):
         self.player1 = player1
         self.player2 = player2
+        self.verbose = verbose      # False: no output and no pauses
+        self.rng = rng
+        self.max_turns = max_turns  # end in a draw after this many turns (None: play on)
+        # {player name: strategy}; a strategy's plan_turn(game, player, opponent)
+        # returns the cards to play, in order. Other players play at random.
+        self.strategies = strategies or {}
+        self.turns = 0
+        self.first_player = None
+
+    def copy(self):
+        """An independent copy of the match, for search. Strategies are not copied."""
+        other = Game.__new__(Game)
+        other.__dict__.update(self.__dict__)
+        other.strategies = {}
+        other.player1 = self.player1.copy()
+        other.player2 = self.player2.copy()
+        if self.first_player is not None:
+            other.first_player = other.player1 if self.first_player is self.player1 else other.player2
+        return other
+
+    def state_key(self):
+        return (self.turns, self.player1.state_key(), self.player2.state_key())
 
     def play_turn(self, current_player, opponent):
+        strategy = self.strategies.get(current_player.name)
+        if strategy is not None:
+            for card in strategy.plan_turn(self, current_player, opponent):
+                current_player.play_card(card, opponent)
+                if self.verbose:
+                    sleep(1.5)
+            return
+        # Built once; a played card is taken out, and the list is only filtered
+        # again when the mana left drops below the dearest card still in it
         playable_cards = [c for c in current_player.hand if c.cost <= current_player.mana]
+        dearest = max([c.cost for c in playable_cards], default=0)
         while playable_cards:
-            card = random.choice(playable_cards)
+            card = self.rng.choice(playable_cards)
             if not current_player.play_card(card, opponent):
                 break
-            playable_cards = [c for c in current_player.hand if c.cost <= current_player.mana]
-            sleep(1.5)
+            playable_cards.remove(card)
+            if current_player.mana < dearest:
+                playable_cards = [c for c in playable_cards if c.cost <= current_player.mana]
+                dearest = max([c.cost for c in playable_cards], default=0)
+            if self.verbose:
+                sleep(1.5)
 
     def start_game(self):
+        """Play the match. Returns the winner's name, or None for a draw at max_turns."""
         players = [self.player1, self.player2]
-        random.shuffle(players)
-        current_player, opponent = players
+        self.rng.shuffle(players)
+        self.first_player = players[0]
+        return self.play_from(*players)
 
+    def play_from(self, current_player, opponent):
+        """Play turns, current_player's first, until the match is over."""
         while True:
+            if self.max_turns is not None and self.turns >= self.max_turns:
+                if self.verbose:
+                    print("\n⌛ The match ends in a draw!")
+                return None
+            self.turns += 1
             current_player.start_turn()
             self.play_turn(current_player, opponent)
-            current_player.discard.extend(current_player.hand)
-            current_player.hand = []
-            
-            print("\n🔮 Processing status effects...")
-            current_player.process_statuses()
-            opponent.process_statuses()
-            sleep(2)
-            
-            if self.player1.health <= 0 or self.player2.health <= 0:
+            if self.end_turn(current_player, opponent):
                 return self.show_game_over()
-
             current_player, opponent = opponent, current_player
 
+    def end_turn(self, current_player, opponent):
+        """Discard the hand and tick statuses. True once a player is down."""
+        current_player.discard.extend(current_player.hand)
+        current_player.hand = []
+        
+        if self.verbose:
+            print("\n🔮 Processing status effects...")
+        current_player.process_statuses()
+        opponent.process_statuses()
+        if self.verbose:
+            sleep(2)
+        
+        return self.player1.health <= 0 or self.player2.health <= 0
+
     def show_game_over(self):
         winner = self.player1 if self.player2.health <= 0 else self.player2
+        if not self.verbose:
+            return winner.name
         print(f"\n🎉 {winner.name} wins!")
         print("""
               ___________
@@ -164,8 +297,22 @@ def show_title_screen():
             return choice
         print("Invalid choice!")
 
-# Card effects remain the same
-# ...
+# ----------------------------
+# Cards
+# ----------------------------
+
+CARDS = [
+    Card("Strike", 1, "Attack", [damage(6)]),
+    Card("Block", 1, "Defense", [armor(5)]),
+    Card("Fireball", 3, "Spell", [damage(10)]),
+    Card("Poison Dart", 2, "Spell", [damage(2), damage_over_time(2, 3)]),
+    Card("Heal", 2, "Spell", [heal(8)]),
+]
+CARDS_BY_NAME = {card.name: card for card in CARDS}
+
+def random_deck(size=15, rng=random):
+    """The deck main() deals: size uniform draws from CARDS."""
+    return [rng.choice(CARDS) for _ in range(size)]
 
 def main():
     while True:
@@ -174,15 +321,8 @@ def main():
             print("Thanks for playing!")
             sys.exit()
         
-        # Create cards and decks
-        cards = [
-            Card("Strike", 1, "Attack", strike),
-            Card("Block", 1, "Defense", block),
-            Card("Fireball", 3, "Spell", fireball),
-            Card("Poison Dart", 2, "Spell", poison_dart),
-            Card("Heal", 2, "Spell", heal),
-        ]
-        base_deck = [random.choice(cards) for _ in range(15)]
+        # Create the deck
+        base_deck = random_deck()
         
         # Initialize players
         player1 = Player("Hero", base_deck)
@@ -0,0 +1,221 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+import AutobattleV3 as game
+
+# Vectorized version of AutobattleV3.run_battle(): K independent battles are
+# kept as one array per stat and advanced a round at a time with masks.
+# Decisions follow GreedyPolicy (special and class ability as soon as they are
+# ready); potions are not modelled, so match it against battles with an empty
+# inventory.
+
+NO_CLASS, KNIGHT, WIZARD, ROGUE = 0, 1, 2, 3
+CLASS_IDS = {"Knight": KNIGHT, "Wizard": WIZARD, "Rogue": ROGUE}
+
+class BattleBatch:
+    """Struct-of-arrays state for K battles."""
+
+    def __init__(self, k):
+        self.k = k
+        ints = lambda: np.zeros(k, dtype=np.int64)
+        # Player
+        self.player_class = ints()
+        self.player_hp = ints()
+        self.player_max_hp = ints()
+        self.player_attack = ints()   # total_attack()
+        self.player_defense = ints()  # total_defense()
+        self.combo = ints()
+        self.special = ints()
+        self.cooldown = ints()
+        # Enemy
+        self.enemy_hp = ints()
+        self.enemy_max_hp = ints()
+        self.enemy_attack = ints()
+        self.enemy_defense = ints()
+        self.burn = ints()
+        self.stunned = ints()
+        self.healed = np.zeros(k, dtype=bool)
+        self.rounds = ints()
+
+    @classmethod
+    def from_pairs(cls, players, enemies):
+        """Load Character/Enemy pairs (same length) into a new batch."""
+        batch = cls(len(players))
+        for i, (player, enemy) in enumerate(zip(players, enemies)):
+            batch.set_player(i, player)
+            batch.set_enemy(i, enemy)
+        return batch
+
+    @classmethod
+    def repeat(cls, player, enemy, k):
+        """K copies of one matchup, the usual shape for a balance question."""
+        batch = cls(k)
+        batch.set_player(slice(None), player)
+        batch.set_enemy(slice(None), enemy)
+        return batch
+
+    def set_player(self, index, player):
+        self.player_class[index] = CLASS_IDS.get(player.name, NO_CLASS)
+        self.player_hp[index] = player.hp
+        self.player_max_hp[index] = player.max_hp
+        self.player_attack[index] = player.total_attack()
+        self.player_defense[index] = player.total_defense()
+        self.combo[index] = player.combo_meter
+        self.special[index] = player.special_meter
+        self.cooldown[index] = player.ability_cooldown
+
+    def set_enemy(self, index, enemy):
+        self.enemy_hp[index] = enemy.hp
+        self.enemy_max_hp[index] = enemy.max_hp
+        self.enemy_attack[index] = enemy.attack
+        self.enemy_defense[index] = enemy.defense
+        self.burn[index] = enemy.burn
+        self.stunned[index] = enemy.stunned
+        self.healed[index] = enemy.heal_used
+
+    def set_wave(self, battle_numbers, difficulty=None):
+        """Fresh create_enemy() opponents for every battle, battle i facing battle_numbers[i].
+
+        Stats come from the enemy stat table as whole array slices; names and
+        emoji don't matter to the kernel and are not drawn.
+        """
+        battle_numbers = np.asarray(battle_numbers)
+        hp, attack, defense = game.enemy_stat_table(difficulty).arrays(int(battle_numbers.max()))
+        self.enemy_hp[:] = hp[battle_numbers]
+        self.enemy_max_hp[:] = self.enemy_hp
+        self.enemy_attack[:] = attack[battle_numbers]
+        self.enemy_defense[:] = defense[battle_numbers]
+        self.burn[:] = 0
+        self.stunned[:] = 0
+        self.healed[:] = False
+
+    def active(self):
+        return (self.player_hp > 0) & (self.enemy_hp > 0)
+
+    def won(self):
+        return self.player_hp > 0
+
+def step(b, rng):
+    """Advance every unfinished battle in b by one round. Returns how many were active."""
+    active = b.active()
+    n_active = int(active.sum())
+    if not n_active:
+        return 0
+    b.rounds += active
+    k = b.k
+
+    # --- Special ability (ends the round) ---
+    special = active & (b.special >= 100)
+    b.enemy_hp -= np.where(special, b.player_attack * 3, 0)
+    b.special[special] = 0
+    b.combo[special] = 0
+
+    # --- Class ability (ends the round) ---
+    ability = active & ~special & (b.cooldown == 0)
+    cls = b.player_class
+    ability_damage = np.select(
+        [cls == KNIGHT, cls == WIZARD, cls == ROGUE],
+        [(b.player_attack * 1.2).astype(np.int64),
+         (b.player_attack * 1.5).astype(np.int64),
+         2 * np.maximum(0, b.player_attack - b.enemy_defense)],
+        0)
+    b.enemy_hp -= np.where(ability, ability_damage, 0)
+    b.stunned[ability & (cls == KNIGHT)] = 1
+    b.burn[ability & (cls == WIZARD)] = 2
+    b.cooldown[ability] = 3
+
+    # Both ability rounds tick the cooldown and skip the enemy's turn
+    skipped = (special | ability) & (b.cooldown > 0)
+    b.cooldown -= skipped
+
+    # --- Normal attack ---
+    normal = active & ~special & ~ability
+    base = np.maximum(0, b.player_attack - b.enemy_defense)
+    critical = rng.random(k) < 0.1
+    damage = base * (1 + critical)
+    hit = damage > 0
+    combo = np.where(hit, b.combo + 1, 0)
+    combo_bonus = hit & (combo >= 3)
+    damage = damage + np.where(combo_bonus, base // 2, 0)  # int(0.5 * base)
+    combo[combo_bonus] = 0
+    b.combo = np.where(normal, combo, b.combo)
+    b.enemy_hp -= np.where(normal, damage, 0)
+    b.special = np.where(normal, np.minimum(100, b.special + 10), b.special)
+
+    # --- Enemy's turn ---
+    enemy_turn = normal & (b.enemy_hp > 0)
+    burning = enemy_turn & (b.burn > 0)
+    b.enemy_hp -= np.where(burning, (0.05 * b.enemy_max_hp).astype(np.int64), 0)
+    b.burn -= burning
+    enemy_turn &= b.enemy_hp > 0
+
+    stunned = enemy_turn & (b.stunned > 0)
+    b.stunned -= stunned
+    acting = enemy_turn & ~stunned
+
+    heals = acting & (b.enemy_hp < b.enemy_max_hp / 2) & ~b.healed & (rng.random(k) < 0.2)
+    b.enemy_hp = np.where(heals, np.minimum(b.enemy_max_hp, b.enemy_hp + (0.1 * b.enemy_max_hp).astype(np.int64)), b.enemy_hp)
+    b.healed |= heals
+
+    attacks = acting & ~heals
+    enemy_critical = rng.random(k) < 0.1
+    enemy_damage = np.maximum(0, b.enemy_attack * (1 + enemy_critical) - b.player_defense)
+    b.player_hp -= np.where(attacks, enemy_damage, 0)
+
+    # End-of-round cooldown tick (battles that ended on burn no longer matter)
+    b.cooldown -= enemy_turn & (b.cooldown > 0)
+    return n_active
+
+def run_batch(batch, rng=None, max_rounds=1000):
+    """Play every battle in batch to completion (or max_rounds). Returns the batch."""
+    if rng is None:
+        rng = np.random.default_rng()
+    for _ in range(max_rounds):
+        if not step(batch, rng):
+            break
+    return batch
+
+# ----------------------------
+# Comparison with the scalar engine
+# ----------------------------
+
+def scalar_stats(class_name, battle_number, k):
+    """Win rate and mean rounds over k run_battle() calls."""
+    wins = rounds = 0
+    policy = game.GreedyPolicy()
+    for _ in range(k):
+        player, enemy = game.new_character(class_name), game.create_enemy(battle_number)
+        result = game.run_battle(player, enemy, policy)
+        wins += result.won
+        rounds += result.rounds
+    return wins / k, rounds / k
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the batch kernel with AutobattleV3.run_battle()")
+    parser.add_argument("-k", type=int, default=100000, help="battles per matchup")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    rng = np.random.default_rng(args.seed)
+    scalar_k = min(args.k, 20000)
+    print(f"{'Matchup':<18}{'win':>14}{'rounds':>14}{'batch/s':>12}{'scalar/s':>11}")
+    print(f"{'':<18}{'batch/scalar':>14}{'batch/scalar':>14}")
+    for class_name in CLASS_IDS:
+        for battle_number in (5, 10, 20):
+            player, enemy = game.new_character(class_name), game.create_enemy(battle_number)
+            start = time.perf_counter()
+            batch = run_batch(BattleBatch.repeat(player, enemy, args.k), rng)
+            batch_rate = args.k / (time.perf_counter() - start)
+            start = time.perf_counter()
+            scalar_win, scalar_rounds = scalar_stats(class_name, battle_number, scalar_k)
+            scalar_rate = scalar_k / (time.perf_counter() - start)
+            print(f"{class_name + ' vs #' + str(battle_number):<18}"
+                  f"{batch.won().mean():>8.3f}/{scalar_win:<5.3f}{batch.rounds.mean():>8.2f}/{scalar_rounds:<5.2f}"
+                  f"{batch_rate:>12.0f}{scalar_rate:>11.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import argparse
+import gc
+import importlib
+import sys
+import time
+import tracemalloc
+
+# Micro benchmarks for the Autobattle data classes.
+
+# ----------------------------
+# Slotted Character / Enemy
+# ----------------------------
+
+def dict_backed(cls):
+    """The same class without __slots__, i.e. how it was before, for comparison."""
+    namespace = {k: v for k, v in cls.__dict__.items()
+                 if k not in ("__slots__", "__dict__", "__weakref__") and k not in cls.__slots__}
+    return type("Dict" + cls.__name__, (), namespace)
+
+def memory_per_instance(factory, n):
+    """Bytes allocated per object when n of them are kept alive."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [factory() for _ in range(n)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    # The list holding the objects is not part of their cost
+    allocated -= sys.getsizeof(objects)
+    del objects
+    return allocated / n
+
+def creation_rate(factory, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        factory()
+    return n / (time.perf_counter() - start)
+
+def lookup_rate(obj, n):
+    """Reads of the combat hot-path attributes per second."""
+    start = time.perf_counter()
+    for _ in range(n):
+        obj.hp; obj.max_hp; obj.name; obj.hp; obj.max_hp; obj.name
+        obj.hp; obj.max_hp; obj.name; obj.hp
+    return 10 * n / (time.perf_counter() - start)
+
+def bench_slots(n):
+    print(f"=== __slots__ Character / Enemy ({n} instances) ===")
+    print(f"{'Class':<28}{'bytes/obj':>11}{'create/s':>12}{'lookups/s':>14}")
+    for module_name in ("Autobattle", "Autobattlev2", "AutobattleV3"):
+        module = importlib.import_module(module_name)
+        make = {
+            "Character": lambda cls: cls("Knight", 100, 15, 10, "🤺"),
+            "Enemy": lambda cls: cls("Goblin", 53, 10, 5, "👾"),
+        }
+        for class_name, build in make.items():
+            slotted = getattr(module, class_name)
+            for cls in (dict_backed(slotted), slotted):
+                factory = lambda: build(cls)
+                label = f"{module_name}.{cls.__name__}"
+                print(f"{label:<28}{memory_per_instance(factory, n):>11.0f}"
+                      f"{creation_rate(factory, n):>12.0f}{lookup_rate(factory(), n):>14.0f}")
+
+# ----------------------------
+# Battle replay recording
+# ----------------------------
+
+def bench_replay(n):
+    import random
+    import AutobattleV3 as game
+    from autobattle_replay import BattleRecorder, record_battle
+
+    policy = game.GreedyPolicy()
+
+    def fighters(i):
+        player = game.starting_characters()[i % 3]
+        player.equip_weapon(game.weapons[0])
+        return player, game.create_enemy(1 + i % 12)
+
+    random.seed(0)
+    start = time.perf_counter()
+    for i in range(n):
+        player, enemy = fighters(i)
+        game.run_battle(player, enemy, policy, random.Random(i))
+    plain = n / (time.perf_counter() - start)
+
+    random.seed(0)
+    recorder = BattleRecorder()
+    size = 0
+    start = time.perf_counter()
+    for i in range(n):
+        player, enemy = fighters(i)
+        size += len(record_battle(player, enemy, policy, seed=i, recorder=recorder)[1])
+    recorded = n / (time.perf_counter() - start)
+
+    print(f"=== Battle replay recording ({n} battles) ===")
+    print(f"plain run_battle   {plain:>10.0f} battles/s")
+    print(f"recorded           {recorded:>10.0f} battles/s ({plain / recorded - 1:.0%} overhead)")
+    print(f"record size        {size / n:>10.1f} bytes/battle")
+
+# ----------------------------
+# Character snapshots: binary vs JSON
+# ----------------------------
+
+def bench_save(n):
+    import json
+    import random
+    import AutobattleV3 as game
+
+    # Characters as a simulation leaves them mid-run
+    rng = random.Random(0)
+    players = []
+    for i in range(n):
+        player = game.starting_characters()[i % 3]
+        for _ in range(rng.randint(0, 10)):
+            player.level_up()
+        player.hp = rng.randint(1, player.max_hp)
+        player.gold = rng.randint(0, 500)
+        player.battles_won = rng.randint(0, 60)
+        player.special_meter = rng.randrange(0, 101, 10)
+        player.equip_weapon(rng.choice(game.weapons))
+        player.equip_armor(rng.choice(game.armors))
+        for item in rng.sample(game.items, rng.randint(0, 3)):
+            player.add_item(item, rng.randint(1, 5))
+        players.append(player)
+
+    def timed(fn, data):
+        start = time.perf_counter()
+        out = [fn(x) for x in data]
+        return out, n / (time.perf_counter() - start)
+
+    json_blobs, json_encode = timed(lambda p: json.dumps(game.character_state(p)).encode("utf-8"), players)
+    json_players, json_decode = timed(lambda b: game.character_from_state(json.loads(b)), json_blobs)
+    binary_blobs, binary_encode = timed(game.encode_character, players)
+    binary_players, binary_decode = timed(game.decode_character, binary_blobs)
+
+    for original, from_json, from_binary in zip(players, json_players, binary_players):
+        expected = game.character_state(original)
+        assert game.character_state(from_json) == expected == game.character_state(from_binary)
+        assert from_binary.total_attack() == original.total_attack()
+        assert from_binary.total_defense() == original.total_defense()
+
+    print(f"=== Character snapshots ({n} characters) ===")
+    print(f"{'Format':<8}{'bytes/char':>12}{'encode/s':>12}{'decode/s':>12}")
+    for label, blobs, encode, decode in (("json", json_blobs, json_encode, json_decode),
+                                         ("binary", binary_blobs, binary_encode, binary_decode)):
+        size = sum(map(len, blobs)) / n
+        print(f"{label:<8}{size:>12.1f}{encode:>12.0f}{decode:>12.0f}")
+
+BENCHMARKS = {
+    "replay": bench_replay,
+    "save": bench_save,
+    "slots": bench_slots,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Autobattle micro benchmarks")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run: {', '.join(sorted(BENCHMARKS))} (default: all)")
+    parser.add_argument("-n", type=int, default=100000)
+    args = parser.parse_args()
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(sorted(unknown))}")
+    for name in args.names or sorted(BENCHMARKS):
+        BENCHMARKS[name](args.n)
+        print()
+
+if __name__ == "__main__":
+    main()
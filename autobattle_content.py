@@ -0,0 +1,113 @@
+import json
+import os
+import pickle
+from collections.abc import Sequence
+
+from autobattle_save import write_atomic
+
+# Game content for AutobattleV3 (weapons, armors, items, enemy names and emoji),
+# loaded from a JSON data file.
+#
+# Nothing is read until the content is first used. The parsed file is then
+# kept as a pickle in __pycache__ next to it, stamped with the source's size
+# and mtime, so later starts skip the JSON parse until the file changes.
+
+CACHE_FORMAT = 1
+
+def _cache_path(path):
+    directory, filename = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, "__pycache__", filename + ".pickle")
+
+def load_data(path):
+    """The parsed data file, from the precompiled cache when it is up to date."""
+    stat = os.stat(path)
+    stamp = (CACHE_FORMAT, stat.st_mtime_ns, stat.st_size)
+    cache = _cache_path(path)
+    try:
+        with open(cache, "rb") as f:
+            cached_stamp, data = pickle.load(f)
+        if cached_stamp == stamp:
+            return data
+    except (OSError, EOFError, ValueError, pickle.PickleError):
+        pass
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    try:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        write_atomic(cache, pickle.dumps((stamp, data), pickle.HIGHEST_PROTOCOL))
+    except OSError:
+        pass  # read-only install: just parse the JSON every time
+    return data
+
+class Registry(Sequence):
+    """One kind of content, by ID (position in the data file) or by name.
+
+    A read-only sequence, so weapons[0], len(items) and random.choice(items)
+    work as they did on the old lists. Built on first use.
+    """
+
+    def __init__(self, load):
+        self._load = load
+        self._entries = None
+        self._ids = None
+
+    def _ensure(self):
+        if self._entries is None:
+            entries = self._load()
+            ids = {}
+            for i, entry in enumerate(entries):
+                if entry.name in ids:
+                    raise ValueError(f"Duplicate content name: {entry.name}")
+                ids[entry.name] = i
+            self._ids = ids
+            self._entries = entries
+        return self._entries
+
+    @property
+    def entries(self):
+        return self._ensure()
+
+    @property
+    def ids(self):
+        """{name: ID}"""
+        self._ensure()
+        return self._ids
+
+    def __len__(self):
+        return len(self._ensure())
+
+    def __iter__(self):
+        return iter(self._ensure())
+
+    def __getitem__(self, index):
+        return self._ensure()[index]
+
+    def id_of(self, name):
+        return self.ids[name]
+
+    def by_name(self, name):
+        """The entry called name; KeyError if there is none."""
+        return self._ensure()[self._ids[name]]
+
+    def get(self, name, default=None):
+        index = self.ids.get(name)
+        return default if index is None else self._entries[index]
+
+class ContentPack:
+    """A content data file. pack[section] is the raw data of one section."""
+
+    def __init__(self, path):
+        self.path = path
+        self._data = None
+
+    def data(self):
+        if self._data is None:
+            self._data = load_data(self.path)
+        return self._data
+
+    def __getitem__(self, section):
+        return self.data()[section]
+
+    def registry(self, section, factory):
+        """A Registry of factory(**fields) for every entry in a section."""
+        return Registry(lambda: [factory(**fields) for fields in self[section]])
@@ -0,0 +1,128 @@
+import argparse
+import os
+import sqlite3
+import time
+
+# Local leaderboard for AutobattleV3, kept in SQLite.
+#
+# Every finished run is one row. The (class_name, difficulty, battles_won)
+# index serves the top-N queries straight off the index, so they stay
+# O(log n + N) however many runs are recorded. WAL mode plus a busy timeout
+# lets several simulator processes submit at once: writers queue on the lock
+# instead of failing, and readers never block them.
+#
+# Query results are cached per connection. SQLite bumps PRAGMA data_version
+# when another connection commits, and our own submits clear the cache
+# directly, so a cached answer is never stale.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    class_name TEXT NOT NULL,
+    difficulty REAL NOT NULL,
+    battles_won INTEGER NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_class ON runs (class_name, difficulty, battles_won DESC);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (battles_won DESC);
+"""
+
+class Leaderboard:
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        self._db = None
+        self._cache = {}
+        self._version = None
+
+    def _connect(self):
+        if self._db is None:
+            db = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(SCHEMA)
+            self._db = db
+        return self._db
+
+    def _cached(self, key, query, args):
+        db = self._connect()
+        version = db.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._version:
+            self._cache.clear()
+            self._version = version
+        rows = self._cache.get(key)
+        if rows is None:
+            rows = self._cache[key] = db.execute(query, args).fetchall()
+        return rows
+
+    def submit(self, class_name, difficulty, battles_won):
+        self.submit_many([(class_name, difficulty, battles_won)])
+
+    def submit_many(self, runs):
+        """Record (class_name, difficulty, battles_won) tuples in one transaction."""
+        db = self._connect()
+        now = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.executemany("INSERT INTO runs (class_name, difficulty, battles_won, recorded_at) "
+                           "VALUES (?, ?, ?, ?)", [run + (now,) for run in runs])
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+        self._cache.clear()
+
+    def top(self, class_name, difficulty, n=10):
+        """The n best runs for a class and difficulty as (battles_won, recorded_at) rows."""
+        return self._cached(("top", class_name, difficulty, n),
+                            "SELECT battles_won, recorded_at FROM runs "
+                            "WHERE class_name = ? AND difficulty = ? "
+                            "ORDER BY battles_won DESC LIMIT ?", (class_name, difficulty, n))
+
+    def high_score(self):
+        """The most battles won in any recorded run (0 if there are none)."""
+        rows = self._cached(("high",), "SELECT MAX(battles_won) FROM runs", ())
+        return rows[0][0] or 0
+
+    def categories(self):
+        """(class_name, difficulty) pairs that have runs."""
+        return self._cached(("categories",),
+                            "SELECT DISTINCT class_name, difficulty FROM runs ORDER BY class_name, difficulty", ())
+
+    def count(self):
+        return self._cached(("count",), "SELECT COUNT(*) FROM runs", ())[0][0]
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+            self._cache.clear()
+            self._version = None
+
+def import_high_score_file(board, path="highscore.txt"):
+    """Carry the old single high score over into an empty leaderboard."""
+    if board.count() or not os.path.exists(path):
+        return
+    try:
+        with open(path, "r") as f:
+            score = int(f.read())
+    except ValueError:
+        return
+    board.submit("Unknown", 1.0, score)
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the AutobattleV3 leaderboard")
+    parser.add_argument("path", nargs="?", default="leaderboard.db")
+    parser.add_argument("-n", type=int, default=10, help="runs to show per class and difficulty")
+    args = parser.parse_args()
+
+    board = Leaderboard(args.path)
+    for class_name, difficulty in board.categories():
+        print(f"=== {class_name} @ {difficulty} ===")
+        for rank, (battles_won, recorded_at) in enumerate(board.top(class_name, difficulty, args.n), 1):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(recorded_at))
+            print(f"{rank:>3}. {battles_won:>6} battles  {when}")
+        print()
+
+if __name__ == "__main__":
+    main()
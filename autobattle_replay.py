@@ -0,0 +1,318 @@
+import argparse
+import random
+import struct
+
+import AutobattleV3 as game
+from AutobattleV3 import (EV_APPEAR, EV_ROUND, EV_SPECIAL, EV_CLASS_ABILITY, EV_ATTACK, EV_ITEM,
+                          EV_BURN, EV_STUNNED, EV_ENEMY_HEAL, EV_ENEMY_ATTACK, EV_DEFEATED,
+                          pack_text, unpack_text)
+
+# Compact binary battle records for AutobattleV3.
+#
+# A record is a header (format version, RNG seed, starting snapshot of both
+# fighters) followed by the run_battle() event stream, one opcode byte per
+# event plus fixed little-endian fields:
+#
+#     APPEAR, ROUND, STUNNED         opcode
+#     SPECIAL, CLASS_ABILITY, BURN,  opcode, damage/heal (u16)
+#     ENEMY_HEAL
+#     ATTACK                         opcode | CRIT, damage (u16), combo bonus (u16)
+#     ENEMY_ATTACK                   opcode | CRIT, damage (u16)
+#     ITEM                           opcode, index into game.items (u16)
+#     DEFEATED                       opcode, cause (u8)
+#
+# The player's decisions are implied by the stream (a SPECIAL event means the
+# special was taken), so replay() re-runs the battle from the seed with a
+# policy that follows the recording, and checks the new stream is identical.
+#
+# Version 1 records kept gear and item IDs (and the item count) in a byte;
+# they still decode and replay.
+
+MAGIC = b"ABR"
+VERSION = 2
+CRIT = 0x80
+NO_GEAR = 0xFFFF
+
+HEADER = struct.Struct("<3sBQ")
+PLAYER = struct.Struct("<hHHHHHHBBBH")   # hp, max_hp, base atk/def, weapon, armor, level, special, combo, cooldown, items
+INVENTORY_ENTRY = struct.Struct("<HH")
+ENEMY = struct.Struct("<hHHHBBB")        # hp, max_hp, attack, defense, flags, burn, stunned
+OP_VALUE = struct.Struct("<BH")
+OP_ATTACK = struct.Struct("<BHH")
+OP_BYTE = struct.Struct("<BB")
+OP_ITEM = OP_VALUE
+RECORD_LENGTH = struct.Struct("<I")
+_pack_value, _pack_attack, _pack_byte = OP_VALUE.pack, OP_ATTACK.pack, OP_BYTE.pack
+
+# ATTACK (without combo bonus) and ENEMY_ATTACK events ready packed, indexed
+# [critical][damage], so most events are copied rather than packed
+PACKED_DAMAGE = 1024
+_ATTACK_EVENTS = [[_pack_attack(EV_ATTACK | crit, damage, 0) for damage in range(PACKED_DAMAGE)]
+                  for crit in (0, CRIT)]
+_ENEMY_ATTACK_EVENTS = [[_pack_value(EV_ENEMY_ATTACK | crit, damage) for damage in range(PACKED_DAMAGE)]
+                        for crit in (0, CRIT)]
+
+# version -> (PLAYER, INVENTORY_ENTRY, NO_GEAR, ITEM event)
+LAYOUTS = {
+    1: (struct.Struct("<hHHHBBHBBBB"), struct.Struct("<BH"), 0xFF, OP_BYTE),
+    2: (PLAYER, INVENTORY_ENTRY, NO_GEAR, OP_ITEM),
+}
+
+# ----------------------------
+# Recording
+# ----------------------------
+
+class BattleRecorder:
+    """Writes the binary record of a battle; recorder.emit is the on_event callback for run_battle().
+
+    Recording is meant to stay on in big simulations, so a recorder can be
+    reused: start() begins the next battle's record in the same buffer, with
+    the same emit(). emit() takes its data as plain arguments (no *data tuple)
+    and mostly copies ready-packed events.
+    """
+
+    def __init__(self, player=None, enemy=None, seed=None, version=VERSION):
+        self.version = version
+        self.layout = LAYOUTS[version]
+        self.buf = bytearray()
+        self.emit = _event_encoder(self.buf, self.layout[3])
+        if player is not None:
+            self.start(player, enemy, seed)
+
+    def start(self, player, enemy, seed):
+        """Begin a new record: the header for these fighters, before the battle is run."""
+        player_struct, entry, no_gear, _ = self.layout
+        weapon, armor, inventory = player.weapon, player.armor, player.inventory
+        weapon_ids, armor_ids, item_ids = _content_ids()
+        buf = self.buf
+        buf.clear()
+        buf += HEADER.pack(MAGIC, self.version, seed)
+        buf += pack_text(player.name)
+        buf += pack_text(player.emoji)
+        buf += player_struct.pack(player.hp, player.max_hp, player.base_attack, player.base_defense,
+                                  weapon_ids[weapon.name] if weapon else no_gear,
+                                  armor_ids[armor.name] if armor else no_gear,
+                                  player.level, player.special_meter, player.combo_meter,
+                                  player.ability_cooldown, len(inventory))
+        for name, info in inventory.items():
+            buf += entry.pack(item_ids[name], info['quantity'])
+        buf += pack_text(enemy.name)
+        buf += pack_text(enemy.emoji)
+        buf += ENEMY.pack(enemy.hp, enemy.max_hp, enemy.attack, enemy.defense,
+                          enemy.is_boss | enemy.heal_used << 1, enemy.burn, enemy.stunned)
+
+    def getvalue(self):
+        return bytes(self.buf)
+
+_ids = None
+
+def _content_ids():
+    """(weapon, armor, item) {name: ID} maps, read on first use rather than at import
+    so importing this module leaves the content unloaded."""
+    global _ids
+    if _ids is None:
+        _ids = game.weapons.ids, game.armors.ids, game.items.ids
+    return _ids
+
+def _event_encoder(buf, op_item):
+    """An on_event callback appending events to buf."""
+    append, extend, pack_item = buf.append, buf.extend, op_item.pack
+
+    def emit(event, a=None, b=False, c=0):
+        if a is None:
+            append(event)
+        elif event == EV_ATTACK:
+            if not c and a < PACKED_DAMAGE:
+                extend(_ATTACK_EVENTS[b][a])
+            else:
+                extend(_pack_attack(event | CRIT if b else event, a, c))
+        elif event == EV_ENEMY_ATTACK:
+            extend(_ENEMY_ATTACK_EVENTS[b][a] if a < PACKED_DAMAGE else _pack_value(event | CRIT if b else event, a))
+        elif event == EV_DEFEATED:
+            extend(_pack_byte(event, a))
+        elif event == EV_ITEM:
+            extend(pack_item(event, _content_ids()[2][a.name]))
+        else:
+            extend(_pack_value(event, a))
+
+    return emit
+
+def tee(*callbacks):
+    """Combine several on_event callbacks (e.g. a renderer and a recorder)."""
+    callbacks = [c for c in callbacks if c is not None]
+    def on_event(event, *data):
+        for callback in callbacks:
+            callback(event, *data)
+    return on_event
+
+def record_battle(player, enemy, policy, seed=None, on_event=None, recorder=None):
+    """Run a battle on its own seeded generator. Returns (BattleResult, record bytes).
+
+    Pass the same recorder to record many battles in a row.
+    """
+    if seed is None:
+        seed = random.getrandbits(64)
+    if recorder is None:
+        recorder = BattleRecorder()
+    recorder.start(player, enemy, seed)
+    listener = tee(recorder.emit, on_event) if on_event else recorder.emit
+    result = game.run_battle(player, enemy, policy, random.Random(seed), listener)
+    return result, recorder.getvalue()
+
+# ----------------------------
+# Decoding and Replay
+# ----------------------------
+
+def record_version(record):
+    magic, version, _ = HEADER.unpack_from(record, 0)
+    if magic != MAGIC or version not in LAYOUTS:
+        raise ValueError(f"Not a battle record of version {', '.join(map(str, LAYOUTS))}")
+    return version
+
+def decode_header(record):
+    """Returns (seed, player, enemy, offset of the first event)."""
+    player_struct, entry, no_gear, _ = LAYOUTS[record_version(record)]
+    _, _, seed = HEADER.unpack_from(record, 0)
+    pos = HEADER.size
+    name, pos = unpack_text(record, pos)
+    emoji, pos = unpack_text(record, pos)
+    (hp, max_hp, base_attack, base_defense, weapon, armor, level,
+     special, combo, cooldown, n_items) = player_struct.unpack_from(record, pos)
+    pos += player_struct.size
+    player = game.Character(name, max_hp, base_attack, base_defense, emoji)
+    player.hp, player.level = hp, level
+    player.special_meter, player.combo_meter, player.ability_cooldown = special, combo, cooldown
+    if weapon != no_gear:
+        player.equip_weapon(game.weapons[weapon])
+    if armor != no_gear:
+        player.equip_armor(game.armors[armor])
+    for _ in range(n_items):
+        index, quantity = entry.unpack_from(record, pos)
+        pos += entry.size
+        player.add_item(game.items[index], quantity)
+    name, pos = unpack_text(record, pos)
+    emoji, pos = unpack_text(record, pos)
+    hp, max_hp, attack, defense, flags, burn, stunned = ENEMY.unpack_from(record, pos)
+    pos += ENEMY.size
+    enemy = game.Enemy(name, max_hp, attack, defense, emoji, bool(flags & 1))
+    enemy.hp, enemy.heal_used = hp, bool(flags & 2)
+    enemy.burn, enemy.stunned = burn, stunned
+    return seed, player, enemy, pos
+
+def decode_events(record, pos=None):
+    """The event stream as (event, *data) tuples, in the on_event argument format."""
+    if pos is None:
+        pos = decode_header(record)[3]
+    op_item = LAYOUTS[record_version(record)][3]
+    events = []
+    end = len(record)
+    while pos < end:
+        op = record[pos]
+        event = op & ~CRIT
+        if event in (EV_ROUND, EV_APPEAR, EV_STUNNED):
+            events.append((event,))
+            pos += 1
+        elif event == EV_ATTACK:
+            _, damage, bonus = OP_ATTACK.unpack_from(record, pos)
+            events.append((event, damage, bool(op & CRIT), bonus))
+            pos += OP_ATTACK.size
+        elif event == EV_ENEMY_ATTACK:
+            _, damage = OP_VALUE.unpack_from(record, pos)
+            events.append((event, damage, bool(op & CRIT)))
+            pos += OP_VALUE.size
+        elif event == EV_ITEM:
+            _, index = op_item.unpack_from(record, pos)
+            events.append((event, game.items[index]))
+            pos += op_item.size
+        elif event == EV_DEFEATED:
+            events.append((event, record[pos + 1]))
+            pos += OP_BYTE.size
+        elif event in (EV_SPECIAL, EV_CLASS_ABILITY, EV_BURN, EV_ENEMY_HEAL):
+            _, value = OP_VALUE.unpack_from(record, pos)
+            events.append((event, value))
+            pos += OP_VALUE.size
+        else:
+            raise ValueError(f"Unknown event opcode {op} at byte {pos}")
+    return events
+
+class ReplayPolicy(game.Policy):
+    """Makes whatever decision the recording shows happening next."""
+
+    def __init__(self, events):
+        super().__init__()
+        self.events = events
+        self.pos = 0
+
+    def advance(self, event, *data):
+        self.pos += 1
+
+    def _next(self):
+        return self.events[self.pos] if self.pos < len(self.events) else (None,)
+
+    def use_special(self, player, enemy):
+        return self._next()[0] == EV_SPECIAL
+
+    def use_class_ability(self, player, enemy):
+        return self._next()[0] == EV_CLASS_ABILITY
+
+    def choose_item(self, player, enemy):
+        event = self._next()
+        return event[1].name if event[0] == EV_ITEM else None
+
+def replay(record, render=False):
+    """Re-run a recorded battle and check it reproduces the record exactly.
+
+    With render=True it goes through battle_renderer(), printing the same
+    frames the live battle printed (apart from the player's prompts).
+    Returns (BattleResult, player, enemy); raises ValueError on divergence.
+    """
+    seed, player, enemy, pos = decode_header(record)
+    policy = ReplayPolicy(decode_events(record, pos))
+    renderer = game.battle_renderer(player, enemy) if render else None
+    recorder = BattleRecorder(player, enemy, seed, record_version(record))
+    result = game.run_battle(player, enemy, policy, random.Random(seed), tee(policy.advance, recorder.emit, renderer))
+    if recorder.getvalue()[pos:] != record[pos:]:
+        raise ValueError("Replay diverged from the recorded battle")
+    return result, player, enemy
+
+# ----------------------------
+# Record Files (length-prefixed records back to back)
+# ----------------------------
+
+def write_records(path, records):
+    pack_length = RECORD_LENGTH.pack
+    with open(path, "ab") as f:
+        f.write(b"".join(part for record in records for part in (pack_length(len(record)), record)))
+
+def read_records(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    pos = 0
+    while pos < len(data):
+        (size,) = RECORD_LENGTH.unpack_from(data, pos)
+        pos += RECORD_LENGTH.size
+        yield data[pos:pos + size]
+        pos += size
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded AutobattleV3 battles")
+    parser.add_argument("path")
+    parser.add_argument("--index", type=int, default=0, help="which record in the file to show")
+    parser.add_argument("--verify", action="store_true", help="check every record instead of showing one")
+    args = parser.parse_args()
+
+    if args.verify:
+        count = 0
+        for record in read_records(args.path):
+            replay(record)
+            count += 1
+        print(f"{count} records replayed identically")
+        return
+    for i, record in enumerate(read_records(args.path)):
+        if i == args.index:
+            replay(record, render=True)
+            return
+    parser.error(f"{args.path} has no record {args.index}")
+
+if __name__ == "__main__":
+    main()
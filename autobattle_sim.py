@@ -0,0 +1,168 @@
+import argparse
+import os
+import time
+
+import AutobattleV3 as game
+from autobattle_leaderboard import Leaderboard
+from autobattle_replay import write_records
+from autobattle_solver import OptimalPolicy
+from sim_pool import chunks, run_chunks
+
+# Monte Carlo balance simulator for AutobattleV3: plays full headless runs for
+# every class and difficulty across a process pool and reports survival curves,
+# boss-wave death rates and the gold economy.
+
+CLASSES = ["Knight", "Wizard", "Rogue"]
+DIFFICULTIES = [0.8, 1.0, 1.2]
+
+POLICIES = dict(game.POLICIES, optimal=OptimalPolicy)
+
+# Runs per task sent to the pool
+CHUNK_SIZE = 2000
+
+# ----------------------------
+# Worker Side
+# ----------------------------
+
+def simulate_chunk(task):
+    """Play one chunk of runs. Returns (cell, aggregate counters, battle records or None)."""
+    class_name, difficulty, first_run, runs, seed, max_battles, policy_name, level_up, shop, leaderboard, record = task
+    policy = POLICIES[policy_name](level_up=level_up, shop=shop)
+    deaths = [0] * (max_battles + 2)       # deaths[n]: runs that lost battle_number n
+    trap_deaths = [0] * (max_battles + 2)  # trap_deaths[n]: runs killed by a trap after winning it
+    stats = {
+        "runs": runs,
+        "deaths": deaths,
+        "trap_deaths": trap_deaths,
+        "battles_won": 0,
+        "gold_earned": 0,
+        "gold_spent": 0,
+        "final_gold": 0,
+    }
+    scores = []
+    records = [] if record else None
+    for run in range(first_run, first_run + runs):
+        run_seed = game.derive_seed(seed, class_name, difficulty, run)
+        result = game.play_run(game.new_character(class_name), policy, max_battles, run_seed,
+                               records.append if record else None, difficulty)
+        if result.trap_death:
+            trap_deaths[result.fell_at] += 1
+        elif result.fell_at is not None:
+            deaths[result.fell_at] += 1
+        stats["battles_won"] += result.battles_won
+        stats["gold_earned"] += result.gold_earned
+        stats["gold_spent"] += result.gold_spent
+        stats["final_gold"] += result.final_gold
+        scores.append((class_name, difficulty, result.battles_won))
+    if leaderboard:
+        # One transaction per chunk; other workers wait their turn on the lock
+        board = Leaderboard(leaderboard)
+        board.submit_many(scores)
+        board.close()
+    return (class_name, difficulty), stats, records
+
+# ----------------------------
+# Sweep and Aggregation
+# ----------------------------
+
+def build_tasks(runs, seed, max_battles, policy_name, level_up, shop, leaderboard=None, record=False):
+    tasks = []
+    for class_name in CLASSES:
+        for difficulty in DIFFICULTIES:
+            for start, size in chunks(runs, CHUNK_SIZE):
+                tasks.append((class_name, difficulty, start, size, seed, max_battles, policy_name, level_up, shop,
+                              leaderboard, record))
+    return tasks
+
+def merge(total, stats):
+    if total is None:
+        return {k: (list(v) if isinstance(v, list) else v) for k, v in stats.items()}
+    for key, value in stats.items():
+        if isinstance(value, list):
+            total[key] = [a + b for a, b in zip(total[key], value)]
+        else:
+            total[key] += value
+    return total
+
+def run_sweep(runs, seed=0, workers=None, max_battles=100, policy_name="greedy", level_up=True, shop=True,
+              leaderboard=None, record=None):
+    """Simulate `runs` games for every class/difficulty pair.
+
+    Returns {(class_name, difficulty): stats}. Run i of a cell is seeded with
+    derive_seed(seed, class_name, difficulty, i), so the same seed gives
+    bit-identical numbers whatever the number of workers or chunk size.
+    With a leaderboard path every run is also recorded there. With a record
+    path every battle's replay record is appended to that file (see
+    autobattle_replay.py), in the same order whatever the number of workers.
+    """
+    tasks = build_tasks(runs, seed, max_battles, policy_name, level_up, shop, leaderboard, bool(record))
+    results = {}
+    for key, stats, records in run_chunks(simulate_chunk, tasks, workers):
+        results[key] = merge(results.get(key), stats)
+        if records:
+            write_records(record, records)
+    return results
+
+def survival_curve(stats):
+    """Fraction of runs still alive after each battle_number (index 0 = before battle 1)."""
+    alive = stats["runs"]
+    curve = [1.0]
+    for fell, trapped in zip(stats["deaths"][1:], stats["trap_deaths"][1:]):
+        alive -= fell + trapped
+        curve.append(alive / stats["runs"])
+    return curve
+
+def boss_death_rate(stats, max_battles):
+    """Share of runs reaching a boss wave (every 10th battle) that lose it (traps after it don't count)."""
+    reached = fell = 0
+    alive = stats["runs"]
+    for battle_number in range(1, max_battles + 1):
+        if battle_number % 10 == 0:
+            reached += alive
+            fell += stats["deaths"][battle_number]
+        alive -= stats["deaths"][battle_number] + stats["trap_deaths"][battle_number]
+    return fell / reached if reached else 0.0
+
+# ----------------------------
+# Report
+# ----------------------------
+
+def print_report(results, max_battles):
+    checkpoints = [n for n in (1, 5, 10, 20, 30, 50, 100) if n <= max_battles]
+    print("=== Survival by battle_number ===")
+    print(f"{'Class':<8}{'Diff':>6}" + "".join(f"{'#' + str(n):>8}" for n in checkpoints))
+    for (class_name, difficulty), stats in sorted(results.items()):
+        curve = survival_curve(stats)
+        print(f"{class_name:<8}{difficulty:>6}" + "".join(f"{curve[n]:>8.1%}" for n in checkpoints))
+
+    print("\n=== Boss waves and gold economy (per run) ===")
+    print(f"{'Class':<8}{'Diff':>6}{'Boss death':>12}{'Won':>8}{'Earned':>10}{'Spent':>10}{'Left':>8}")
+    for (class_name, difficulty), stats in sorted(results.items()):
+        runs = stats["runs"]
+        print(f"{class_name:<8}{difficulty:>6}{boss_death_rate(stats, max_battles):>12.1%}"
+              f"{stats['battles_won'] / runs:>8.1f}{stats['gold_earned'] / runs:>10.1f}"
+              f"{stats['gold_spent'] / runs:>10.1f}{stats['final_gold'] / runs:>8.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo balance sweep for AutobattleV3")
+    parser.add_argument("--runs", type=int, default=10000, help="runs per class and difficulty")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-battles", type=int, default=100)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="greedy")
+    parser.add_argument("--no-level-up", action="store_true", help="never take the free level up between battles")
+    parser.add_argument("--no-shop", action="store_true", help="keep the starting gear and buy no potions")
+    parser.add_argument("--leaderboard", metavar="PATH", help="record every run in this leaderboard database")
+    parser.add_argument("--record", metavar="PATH", help="append a replay record of every battle to this file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_sweep(args.runs, args.seed, args.workers, args.max_battles,
+                        args.policy, not args.no_level_up, not args.no_shop, args.leaderboard, args.record)
+    elapsed = time.perf_counter() - start
+    print_report(results, args.max_battles)
+    total = args.runs * len(CLASSES) * len(DIFFICULTIES)
+    print(f"\n{total} runs in {elapsed:.1f}s ({total / elapsed:.0f} runs/s, {args.workers} workers)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+import argparse
+import copy
+import random
+import sys
+import time
+
+import AutobattleV3 as game
+
+# Exact battle odds for AutobattleV3. With stats fixed for the whole battle a
+# fight is a Markov chain over
+#
+#     (player hp, enemy hp, combo, special, cooldown, burn, stun, enemy healed)
+#
+# so a memoized recursion over that state gives the exact win probability and
+# expected remaining HP instead of sampling run_battle() millions of times.
+# Potions are not modelled (the solver plays with an empty inventory).
+
+CRIT_CHANCE = 0.1
+HEAL_CHANCE = 0.2
+
+# Actions open to the player at the start of a round
+SPECIAL, CLASS_ABILITY, ATTACK = 0, 1, 2
+
+class BattleOdds:
+    def __init__(self, win_prob, expected_hp, states):
+        self.win_prob = win_prob
+        self.expected_hp = expected_hp  # player HP left at the end, counting a loss as 0
+        self.states = states            # distinct combat states evaluated
+
+    def __repr__(self):
+        return f"BattleOdds(win_prob={self.win_prob:.6f}, expected_hp={self.expected_hp:.3f}, states={self.states})"
+
+class BattleModel:
+    """Transition rules of run_battle() for one Character build against one Enemy."""
+
+    def __init__(self, player, enemy):
+        self.player = player
+        self.enemy = enemy
+        self.attack = player.total_attack()
+        self.defense = player.total_defense()
+        self.class_name = player.name
+        self.enemy_max_hp = enemy.max_hp
+        self.enemy_attack = enemy.attack
+        self.enemy_defense = enemy.defense
+        self.base_damage = max(0, self.attack - self.enemy_defense)
+        self.burn_damage = int(0.05 * enemy.max_hp)
+        self.heal_amount = int(0.1 * enemy.max_hp)
+        self.enemy_damage = max(0, self.enemy_attack - self.defense)
+        self.enemy_crit_damage = max(0, self.enemy_attack * 2 - self.defense)
+
+    def start_state(self):
+        return live_state(self.player, self.enemy)
+
+    def actions(self, state):
+        """The actions run_battle() would offer a policy in this state, ATTACK always last."""
+        actions = []
+        if state[3] >= 100:
+            actions.append(SPECIAL)
+        if state[4] == 0:
+            actions.append(CLASS_ABILITY)
+        actions.append(ATTACK)
+        return actions
+
+    def outcomes(self, state, action):
+        """List of (probability, next_state) for one round starting with action."""
+        php, ehp, combo, special, cooldown, burn, stun, healed = state
+        if action == SPECIAL:
+            ehp -= self.attack * 3
+            return [(1.0, (php, ehp, 0, 0, max(0, cooldown - 1), burn, stun, healed))]
+
+        if action == CLASS_ABILITY:
+            if self.class_name == "Knight":
+                ehp -= int(self.attack * 1.2)
+                stun = 1
+            elif self.class_name == "Wizard":
+                ehp -= int(self.attack * 1.5)
+                burn = 2
+            elif self.class_name == "Rogue":
+                ehp -= 2 * self.base_damage
+            return [(1.0, (php, ehp, combo, special, 2, burn, stun, healed))]
+
+        result = []
+        base = self.base_damage
+        special = min(100, special + 10)
+        for crit_p, damage in ((CRIT_CHANCE, base * 2), (1 - CRIT_CHANCE, base)):
+            new_combo = 0
+            if damage > 0:
+                new_combo = combo + 1
+                if new_combo >= 3:
+                    damage += int(0.5 * base)
+                    new_combo = 0
+            hp = ehp - damage
+            if hp <= 0:
+                result.append((crit_p, (php, hp, new_combo, special, cooldown, burn, stun, healed)))
+                continue
+            self._enemy_turn(result, crit_p, php, hp, new_combo, special, cooldown, burn, stun, healed)
+        return result
+
+    def _enemy_turn(self, result, p, php, ehp, combo, special, cooldown, burn, stun, healed):
+        if burn > 0:
+            ehp -= self.burn_damage
+            burn -= 1
+            if ehp <= 0:
+                result.append((p, (php, ehp, combo, special, cooldown, burn, stun, healed)))
+                return
+        cooldown = max(0, cooldown - 1)
+        if stun > 0:
+            result.append((p, (php, ehp, combo, special, cooldown, burn, stun - 1, healed)))
+            return
+        attack_p = p
+        if ehp < self.enemy_max_hp / 2 and not healed:
+            healed_hp = min(self.enemy_max_hp, ehp + self.heal_amount)
+            result.append((p * HEAL_CHANCE, (php, healed_hp, combo, special, cooldown, burn, stun, True)))
+            attack_p = p * (1 - HEAL_CHANCE)
+        result.append((attack_p * CRIT_CHANCE, (php - self.enemy_crit_damage, ehp, combo, special, cooldown, burn, stun, healed)))
+        result.append((attack_p * (1 - CRIT_CHANCE), (php - self.enemy_damage, ehp, combo, special, cooldown, burn, stun, healed)))
+
+    def policy_action(self, policy, state, views):
+        """Ask a Policy what it would do in state, through throwaway copies of the fighters."""
+        player, enemy = views
+        php, ehp, combo, special, cooldown, burn, stun, healed = state
+        player.hp, player.combo_meter, player.special_meter, player.ability_cooldown = php, combo, special, cooldown
+        enemy.hp, enemy.heal_used = ehp, healed
+        enemy.burn, enemy.stunned = burn, stun
+        if special >= 100 and policy.use_special(player, enemy):
+            return SPECIAL
+        if cooldown == 0 and policy.use_class_ability(player, enemy):
+            return CLASS_ABILITY
+        return ATTACK
+
+    def views(self):
+        player = copy.copy(self.player)
+        player.inventory = {}
+        enemy = copy.copy(self.enemy)
+        return player, enemy
+
+def evaluate(model, choose, memo):
+    """Memoized value function: maps state -> (win probability, expected final HP).
+
+    choose(state) returns the action to take. A state reached again while it
+    is still being evaluated belongs to a loop where neither side can ever
+    deal damage; the real game would never end it, so it counts as a loss.
+    Direct self-loops (a round that changes nothing, such as a 0 damage
+    exchange that only a crit can break) are solved exactly.
+    """
+    in_progress = set()
+
+    def value(state):
+        if state[1] <= 0:
+            return 1.0, state[0]
+        if state[0] <= 0:
+            return 0.0, 0.0
+        cached = memo.get(state)
+        if cached is not None:
+            return cached
+        if state in in_progress:
+            return 0.0, 0.0
+        in_progress.add(state)
+        win = hp = stay = 0.0
+        for p, nxt in model.outcomes(state, choose(state)):
+            if nxt == state:
+                stay += p
+                continue
+            w, h = value(nxt)
+            win += p * w
+            hp += p * h
+        if stay:
+            leave = 1.0 - stay
+            win, hp = (win / leave, hp / leave) if leave > 1e-12 else (0.0, 0.0)
+        in_progress.discard(state)
+        memo[state] = (win, hp)
+        return win, hp
+
+    return value
+
+def solve_battle(player, enemy, policy=None):
+    """Exact BattleOdds for run_battle(player, enemy, policy) with no potions.
+
+    player and enemy are read, not modified; policy defaults to GreedyPolicy.
+    """
+    if policy is None:
+        policy = game.GreedyPolicy()
+    model = BattleModel(player, enemy)
+    views = model.views()
+    decisions = {}
+
+    def choose(state):
+        action = decisions.get(state)
+        if action is None:
+            action = decisions[state] = model.policy_action(policy, state, views)
+        return action
+
+    memo = {}
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20000))
+    win, hp = evaluate(model, choose, memo)(model.start_state())
+    return BattleOdds(win, hp, len(memo))
+
+# ----------------------------
+# Optimal Play
+# ----------------------------
+
+OBJECTIVES = {
+    # Compare (win probability, expected hp) pairs in objective order; the
+    # rounding keeps float noise in the first key from hiding the tie-break
+    "survival": lambda value: (round(value[0], 12), value[1]),
+    "hp": lambda value: (round(value[1], 9), value[0]),
+}
+
+def pack_state(state):
+    """One int per live state, used as the policy table key."""
+    php, ehp, combo, special, cooldown, burn, stun, healed = state
+    return (((((((php << 20 | ehp) << 2 | combo) << 7 | special) << 2 | cooldown) << 2 | burn) << 1 | stun) << 1) | healed
+
+def live_state(player, enemy):
+    return (player.hp, enemy.hp, player.combo_meter, player.special_meter, player.ability_cooldown,
+            enemy.burn, enemy.stunned, enemy.heal_used)
+
+class OptimalSolver:
+    """Best action for every state of one matchup, solved on demand and kept.
+
+    table maps pack_state(state) to SPECIAL, CLASS_ABILITY or ATTACK, so a
+    player can look its move up in O(1) once a state has been solved.
+    """
+
+    def __init__(self, model, objective="survival"):
+        self.model = model
+        self.rank = OBJECTIVES[objective]
+        self.table = {}
+        self.memo = {}
+        self.in_progress = set()
+        sys.setrecursionlimit(max(sys.getrecursionlimit(), 20000))
+
+    def value(self, state):
+        if state[1] <= 0:
+            return 1.0, state[0]
+        if state[0] <= 0:
+            return 0.0, 0.0
+        cached = self.memo.get(state)
+        if cached is not None:
+            return cached
+        if state in self.in_progress:
+            return 0.0, 0.0  # see evaluate(): a loop nobody can break
+        self.in_progress.add(state)
+        best = best_action = None
+        for action in self.model.actions(state):
+            win = hp = stay = 0.0
+            for p, nxt in self.model.outcomes(state, action):
+                if nxt == state:
+                    stay += p
+                    continue
+                w, h = self.value(nxt)
+                win += p * w
+                hp += p * h
+            if stay:
+                leave = 1.0 - stay
+                win, hp = (win / leave, hp / leave) if leave > 1e-12 else (0.0, 0.0)
+            # Ties go to the action listed first, so a free special is never wasted
+            if best is None or self.rank((win, hp)) > self.rank(best):
+                best, best_action = (win, hp), action
+        self.in_progress.discard(state)
+        self.memo[state] = best
+        self.table[pack_state(state)] = best_action
+        return best
+
+    def action(self, state):
+        key = pack_state(state)
+        action = self.table.get(key)
+        if action is None:
+            self.value(state)
+            action = self.table[key]
+        return action
+
+def solve_optimal(player, enemy, objective="survival"):
+    """BattleOdds under optimal play plus the OptimalSolver holding its policy table."""
+    model = BattleModel(player, enemy)
+    solver = OptimalSolver(model, objective)
+    win, hp = solver.value(model.start_state())
+    return BattleOdds(win, hp, len(solver.memo)), solver
+
+class OptimalPolicy(game.GreedyPolicy):
+    """Plays the special and class ability from a solved policy table.
+
+    Tables are cached by the fight's stats (class, total attack/defense and
+    the enemy's stat block), so a gear change or level up simply solves a new
+    table the next time the player acts. Potions follow GreedyPolicy.
+    """
+
+    MAX_TABLES = 256
+
+    def __init__(self, objective="survival", level_up=True, shop=True):
+        super().__init__(level_up, shop)
+        self.objective = objective
+        self.solvers = {}
+
+    def solver_for(self, player, enemy):
+        key = (player.name, player.total_attack(), player.total_defense(), enemy.max_hp, enemy.attack, enemy.defense)
+        solver = self.solvers.get(key)
+        if solver is None:
+            if len(self.solvers) >= self.MAX_TABLES:
+                self.solvers.clear()
+            solver = self.solvers[key] = OptimalSolver(BattleModel(player, enemy), self.objective)
+        return solver
+
+    def use_special(self, player, enemy):
+        return self.solver_for(player, enemy).action(live_state(player, enemy)) == SPECIAL
+
+    def use_class_ability(self, player, enemy):
+        return self.solver_for(player, enemy).action(live_state(player, enemy)) == CLASS_ABILITY
+
+# ----------------------------
+# Command line: exact odds next to a Monte Carlo estimate
+# ----------------------------
+
+def sample(class_name, battle_number, policy, n):
+    wins = hp = 0
+    for _ in range(n):
+        player, enemy = game.new_character(class_name), game.create_enemy(battle_number)
+        result = game.run_battle(player, enemy, policy)
+        wins += result.won
+        hp += max(0, result.player_hp)
+    return wins / n, hp / n
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact win odds for AutobattleV3 battles")
+    parser.add_argument("--policy", choices=["greedy", "threshold"], default="greedy")
+    parser.add_argument("--battles", type=int, nargs="+", default=[5, 10, 15, 20])
+    parser.add_argument("--samples", type=int, default=0, help="also run this many battles to compare")
+    parser.add_argument("--optimal", choices=sorted(OBJECTIVES), help="solve the best policy instead")
+    args = parser.parse_args()
+
+    policy = OptimalPolicy(args.optimal) if args.optimal else game.POLICIES[args.policy]()
+    random.seed(0)
+    print(f"{'Matchup':<18}{'win':>10}{'E[hp]':>10}{'states':>9}{'ms':>8}")
+    for class_name in ("Knight", "Wizard", "Rogue"):
+        for battle_number in args.battles:
+            player, enemy = game.new_character(class_name), game.create_enemy(battle_number)
+            start = time.perf_counter()
+            if args.optimal:
+                odds, _ = solve_optimal(player, enemy, args.optimal)
+            else:
+                odds = solve_battle(player, enemy, policy)
+            ms = (time.perf_counter() - start) * 1000
+            line = f"{class_name + ' vs #' + str(battle_number):<18}{odds.win_prob:>10.6f}{odds.expected_hp:>10.3f}{odds.states:>9}{ms:>8.1f}"
+            if args.samples:
+                win, hp = sample(class_name, battle_number, policy, args.samples)
+                line += f"   sampled {win:.4f} / {hp:.3f}"
+            print(line)
+
+if __name__ == "__main__":
+    main()
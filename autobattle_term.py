@@ -0,0 +1,200 @@
+import builtins
+import re
+import shutil
+import sys
+import time
+import unicodedata
+from contextlib import contextmanager
+
+# In-place terminal rendering for the Autobattle games.
+#
+# Everything printed after clear_screen() is one frame (a battle round, a
+# menu). While attached, Screen stands in for sys.stdout and collects the
+# frame's lines. When the game pauses or asks for input, the frame goes out
+# in a single write: unchanged rows are skipped, and changed rows are redrawn
+# in place with cursor positioning plus erase-to-end-of-line. The screen is
+# never blanked first, so nothing flickers, and no `clear` process is spawned.
+#
+# At a prompt the terminal echoes the player's answer, which is added to the
+# frame so the rows stay in step. When stdin is not a terminal (or the frame
+# did not fit) that can't be known, so output runs on as plain text until the
+# next clear_screen(), and that frame is drawn in full.
+#
+# Clock paces the games: every pause goes through clock.wait(), scaled by the
+# chosen speed.
+
+CSI = "\x1b["
+RESET = CSI + "0m"
+_ANSI = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+def visible_width(line):
+    """Terminal columns a line takes up (colour codes ignored, emoji count double)."""
+    width = 0
+    for ch in _ANSI.sub("", line):
+        if unicodedata.combining(ch) or ch == "\ufe0f":
+            continue
+        width += 2 if unicodedata.east_asian_width(ch) in "WF" else 1
+    return width
+
+class Screen:
+    def __init__(self, stream=None, autoreset=False):
+        self.stream = stream or sys.stdout
+        self.enabled = self.stream.isatty()
+        self.autoreset = autoreset   # end every write with a colour reset, like colorama's autoreset
+        self.attached = False
+        self.positioned = False      # collecting a frame (from clear() until rows are lost track of)
+        self.lines = [""]            # the frame so far; the last entry is the unfinished line
+        self.pending = []            # plain output after a prompt
+        self.shown = None            # rows on the terminal, None when unknown
+
+    # --- file interface, for use as sys.stdout ---
+
+    def write(self, text):
+        size = len(text)
+        if self.autoreset and text.strip():
+            text += RESET
+        if self.positioned:
+            parts = text.split("\n")
+            self.lines[-1] += parts[0]
+            self.lines.extend(parts[1:])
+        else:
+            self.pending.append(text)
+        return size
+
+    def flush(self):
+        # Frames go out on present(); colorama and print() flush after every write
+        pass
+
+    def isatty(self):
+        return self.enabled
+
+    # --- frames ---
+
+    def clear(self):
+        """Start a new frame (what clear_screen() used to do)."""
+        if not self.attached:
+            if self.enabled:
+                self.stream.write(CSI + "H" + CSI + "J")
+                self.stream.flush()
+            return
+        if not self.positioned:
+            self.pending.clear()
+            self.shown = None
+            self.positioned = True
+        self.lines = [""]
+
+    def present(self):
+        """Write out whatever the current frame has that the terminal doesn't show yet."""
+        if not self.attached:
+            return
+        if self.positioned:
+            out = self._redraw()
+        else:
+            out = "".join(self.pending)
+            self.pending.clear()
+        if out:
+            self.stream.write(out)
+            self.stream.flush()
+
+    def _redraw(self):
+        lines = self.lines
+        rows = lines if lines[-1] else lines[:-1]
+        columns, height = shutil.get_terminal_size()
+        shown = self.shown
+        fits = len(rows) < height and all(visible_width(row) < columns for row in rows)
+        if shown is None or not fits:
+            # Draw top to bottom. A frame that wraps or scrolls can't be patched by row later
+            self.shown = list(rows) if fits else None
+            return CSI + "H" + CSI + "J" + "\n".join(rows) + ("" if lines[-1] else "\n")
+        out = []
+        for i, row in enumerate(rows):
+            if i >= len(shown) or shown[i] != row:
+                out.append(f"{CSI}{i + 1};1H{row}{CSI}K")
+        if len(shown) > len(rows):
+            out.append(f"{CSI}{len(rows) + 1};1H{CSI}J")
+        if not out:
+            return ""
+        # Leave the cursor where plain printing would have left it
+        if lines[-1]:
+            out.append(f"{CSI}{len(rows)};{visible_width(lines[-1]) + 1}H")
+        else:
+            out.append(f"{CSI}{len(rows) + 1};1H")
+        self.shown = list(rows)
+        return "".join(out)
+
+    def input(self, prompt=""):
+        self.write(str(prompt))
+        self.present()
+        answer = self._input()
+        if self.positioned and self.shown is not None and sys.stdin.isatty():
+            # The terminal echoed the answer and the newline; keep the frame in step
+            self.lines[-1] += answer
+            self.lines.append("")
+            self.shown = self.lines[:-1]
+        else:
+            self.positioned = False
+            self.shown = None
+            self.lines = [""]
+        return answer
+
+    @contextmanager
+    def attach(self):
+        """Route print() and input() through the screen for the duration (no-op off a terminal)."""
+        if not self.enabled:
+            yield self
+            return
+        saved = sys.stdout, builtins.input
+        self._input = builtins.input
+        sys.stdout, builtins.input = self, self.input
+        self.attached = True
+        try:
+            yield self
+        finally:
+            self.present()
+            self.attached = False
+            sys.stdout, builtins.input = saved
+
+# ----------------------------
+# Pacing
+# ----------------------------
+
+SPEEDS = {"1x": 1.0, "4x": 0.25, "instant": 0.0, "skip": 0.0}  # speed -> share of each pause actually waited
+
+class Clock:
+    """Game speed. "skip" is "instant" that also draws no battle frames, so a
+    battle jumps straight to its result; while skipping the games make the
+    player's combat decisions themselves rather than prompting.
+
+    sleep can be replaced for tests; elapsed adds up the pauses asked for, at
+    1x, so a test can check the pacing of a run that took no time at all.
+    """
+
+    def __init__(self, speed="1x", sleep=time.sleep):
+        self.sleep = sleep
+        self.elapsed = 0.0
+        self.in_battle = False
+        self.set_speed(speed)
+
+    def set_speed(self, speed):
+        if speed not in SPEEDS:
+            raise ValueError(f"Unknown speed {speed!r}, expected one of {', '.join(SPEEDS)}")
+        self.speed = speed
+        self.scale = SPEEDS[speed]
+
+    def wait(self, seconds):
+        self.elapsed += seconds
+        if self.scale:
+            self.sleep(seconds * self.scale)
+
+    @property
+    def skipping(self):
+        return self.in_battle and self.speed == "skip"
+
+    @contextmanager
+    def battle(self):
+        """Mark a battle in progress, for the "skip" speed."""
+        self.in_battle = True
+        try:
+            yield
+        finally:
+            self.in_battle = False
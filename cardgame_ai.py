@@ -0,0 +1,253 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from CardGame import MAX_HEALTH
+
+# Computer players for CardGame: strategies for Game(strategies=...), each
+# with plan_turn(game, player, opponent) returning the cards to play.
+#
+# KnapsackPlayer spends its mana on the most valuable set of cards in hand,
+# by an effect-weighted score.
+#
+# MCTSPlayer searches with Monte Carlo Tree Search.
+#
+# The tree covers the searching player's own turn: its hand and mana are
+# known, so the moves available after playing some cards are the same in
+# every simulation. Playing a card never hurts (the hand is discarded at the
+# end of the turn anyway) and nothing a card does depends on what was played
+# before it in the same turn, so a node is the multiset of cards played so
+# far, and different play orders share statistics.
+#
+# What the player can't see (the order of both decks) is determinized: each
+# iteration shuffles them in a fresh copy of the match, plays the node's
+# cards, and finishes the game with random play, as Game.play_turn() does.
+#
+# With workers > 1 the search is root-parallel: every process searches the
+# same turn with its own seed and the node statistics are added together.
+
+# ----------------------------
+# Knapsack Player
+# ----------------------------
+
+# What one point of each effect is worth: damage, armor, heal, damage over time.
+# Healing past MAX_HEALTH is worth nothing.
+CARD_WEIGHTS = (1.0, 0.6, 0.8, 0.9)
+
+class KnapsackPlayer:
+    """Plays the cards whose weighted effects add up to the most within the mana available."""
+
+    def __init__(self, weights=CARD_WEIGHTS):
+        self.weights = tuple(weights)
+
+    def plan_turn(self, game, player, opponent):
+        groups = {}
+        for card in player.hand:
+            groups.setdefault(card.name, []).append(card)
+        kinds = tuple(sorted((name, cards[0].cost, cards[0].totals, len(cards)) for name, cards in groups.items()))
+        # Only as much missing health as the hand could heal changes the answer
+        heal_room = min(MAX_HEALTH - player.health, sum(kind[2][2] * kind[3] for kind in kinds))
+        counts = best_counts(kinds, player.mana, max(heal_room, 0), self.weights)
+        return [card for kind, count in zip(kinds, counts) for card in groups[kind[0]][:count]]
+
+@lru_cache(maxsize=1 << 16)
+def best_counts(kinds, mana, heal_room, weights=CARD_WEIGHTS):
+    """How many of each kind of card to play: a bounded knapsack solved by DP.
+
+    kinds is a sorted tuple of (name, cost, totals, count in hand), so equal
+    hands share a cache entry whatever order the cards were drawn in. Ties go
+    to the plan spending more mana.
+    """
+    memo = {}
+
+    def best(i, mana, room):
+        if i == len(kinds):
+            return (0.0, 0), ()
+        key = (i, mana, room)
+        result = memo.get(key)
+        if result is None:
+            _, cost, (damage, armor, heal, dot), count = kinds[i]
+            plain = damage * weights[0] + armor * weights[1] + dot * weights[3]
+            if cost:
+                count = min(count, mana // cost)
+            for n in range(count + 1):
+                healed = min(n * heal, room)
+                (value, spent), rest = best(i + 1, mana - n * cost, room - healed)
+                score = (value + n * plain + healed * weights[2], spent + n * cost)
+                if result is None or score > result[0]:
+                    result = score, (n,) + rest
+            memo[key] = result
+        return result
+
+    return best(0, mana, heal_room)[1]
+
+# ----------------------------
+# MCTS Player
+# ----------------------------
+
+# Rollouts of a match with no turn limit are cut off (as a draw) this many turns on
+MAX_ROLLOUT_TURNS = 200
+
+class MCTSPlayer:
+    def __init__(self, iterations=1000, seconds=None, exploration=1.4, workers=1, seed=None):
+        self.iterations = iterations    # simulations per turn (None: until time runs out)
+        self.seconds = seconds          # time budget per turn (None: no limit)
+        self.exploration = exploration  # UCT exploration constant
+        self.workers = workers
+        self.rng = random.Random(seed)
+        self.pool = None
+        self.simulations = 0            # total simulations run, for reporting
+
+    def plan_turn(self, game, player, opponent):
+        """The cards from player's hand to play this turn, in order."""
+        affordable = {card.name for card in player.hand if card.cost <= player.mana}
+        if len(affordable) <= 1 or sum(card.cost for card in player.hand) <= player.mana:
+            # Nothing to choose between (no card, copies of one card, or the whole
+            # hand): the plan is forced, so skip the search
+            table = {}
+        elif self.workers > 1:
+            table = self._search_parallel(game, player, opponent)
+        else:
+            table = search(game, player, opponent, self.iterations, self.seconds, self.exploration, self.rng)
+        self.simulations += table[()][0] if () in table else 0
+        plan = best_plan(table, player)
+        hand = player.hand.copy()
+        cards = []
+        for name in plan:
+            card = next(card for card in hand if card.name == name)
+            hand.remove(card)
+            cards.append(card)
+        return cards
+
+    def _search_parallel(self, game, player, opponent):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        snapshot = game.copy()
+        for p in (snapshot, snapshot.player1, snapshot.player2):
+            p.rng = None  # the random module does not pickle; workers bring their own
+        current = 1 if player is game.player1 else 2
+        iterations = None if self.iterations is None else -(-self.iterations // self.workers)
+        tasks = [(snapshot, current, iterations, self.seconds, self.exploration, self.rng.getrandbits(64))
+                 for _ in range(self.workers)]
+        total = {}
+        for table in self.pool.map(_search_task, tasks):
+            for key, (visits, reward) in table.items():
+                stats = total.setdefault(key, [0, 0.0])
+                stats[0] += visits
+                stats[1] += reward
+        return total
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+def _search_task(task):
+    game, current, iterations, seconds, exploration, seed = task
+    player, opponent = (game.player1, game.player2) if current == 1 else (game.player2, game.player1)
+    return search(game, player, opponent, iterations, seconds, exploration, random.Random(seed))
+
+# ----------------------------
+# Search
+# ----------------------------
+
+def search(game, player, opponent, iterations=1000, seconds=None, exploration=1.4, rng=random):
+    """Run MCTS for player's turn. Returns {played names (sorted tuple): [visits, reward]}.
+
+    At least one of iterations and seconds should be set.
+    """
+    costs = {card.name: card.cost for card in player.hand}
+    hand = sorted(card.name for card in player.hand)
+    mana = player.mana
+    deadline = None if seconds is None else time.perf_counter() + seconds
+    table = {(): [0, 0.0]}
+    log = math.log
+    sqrt = math.sqrt
+    done = 0
+    while iterations is None or done < iterations:
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        done += 1
+
+        # Selection and expansion: walk down by UCT until a new node is added
+        key = ()
+        path = [table[key]]
+        remaining = hand.copy()
+        left = mana
+        while True:
+            options = {name for name in remaining if costs[name] <= left}
+            if not options:
+                break
+            parent_log = log(path[-1][0] or 1)
+            best = best_score = None
+            new = False
+            for name in sorted(options):
+                child = tuple(sorted(key + (name,)))
+                stats = table.get(child)
+                if stats is None:
+                    best, new = name, True
+                    break
+                score = stats[1] / stats[0] + exploration * sqrt(parent_log / stats[0])
+                if best is None or score > best_score:
+                    best, best_score = name, score
+            key = tuple(sorted(key + (best,)))
+            if new:
+                table[key] = [0, 0.0]
+            path.append(table[key])
+            remaining.remove(best)
+            left -= costs[best]
+            if new:
+                break
+
+        reward = rollout(game, player, opponent, key, rng)
+        for stats in path:
+            stats[0] += 1
+            stats[1] += reward
+    return table
+
+def rollout(game, player, opponent, played, rng):
+    """Finish the match from a determinized copy after playing `played`. 1 win, 0.5 draw, 0 loss."""
+    sim = game.copy()
+    sim.verbose = False
+    sim.rng = rng
+    if sim.max_turns is None:
+        sim.max_turns = sim.turns + MAX_ROLLOUT_TURNS
+    me = sim.player1 if player is game.player1 else sim.player2
+    them = sim.player2 if me is sim.player1 else sim.player1
+    for p in (me, them):
+        p.verbose = False
+        p.rng = rng
+        rng.shuffle(p.deck)
+    for name in played:
+        for card in me.hand:
+            if card.name == name:
+                me.play_card(card, them)
+                break
+    sim.play_turn(me, them)  # anything still affordable, at random
+    if sim.end_turn(me, them):
+        winner = sim.show_game_over()
+    else:
+        winner = sim.play_from(them, me)
+    if winner is None:
+        return 0.5
+    return 1.0 if winner == me.name else 0.0
+
+def best_plan(table, player):
+    """Follow the most visited child from the root; names of the cards to play, in order."""
+    costs = {card.name: card.cost for card in player.hand}
+    remaining = [card.name for card in player.hand]
+    left = player.mana
+    key = ()
+    plan = []
+    while True:
+        options = {name for name in remaining if costs[name] <= left}
+        if not options:
+            return plan
+        # Unexplored corners of the tree fall back to the costliest card
+        name = max(options, key=lambda name: (table.get(tuple(sorted(key + (name,))), (0,))[0], costs[name], name))
+        key = tuple(sorted(key + (name,)))
+        plan.append(name)
+        remaining.remove(name)
+        left -= costs[name]
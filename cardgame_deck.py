@@ -0,0 +1,156 @@
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import CardGame as game
+from cardgame_sim import AIS, deck_summary, merge, simulate_chunk
+from sim_pool import chunks, run_chunks
+
+# Deck builder for CardGame: hill-climbs over 15-card deck compositions,
+# scoring each candidate by headless matches against a reference deck.
+#
+# A composition is how many of each card in CARDS the deck holds, so decks
+# that only differ in order share one cache entry. Every candidate plays the
+# same seeded matches (common random numbers), so the difference between
+# two scores is the decks rather than the dice. All the candidates of a step
+# are evaluated as one batch across the process pool.
+
+# Matches per task sent to the pool
+CHUNK_SIZE = 500
+
+def composition(deck):
+    """The deck as a tuple of counts, one per card in CARDS."""
+    counts = [0] * len(game.CARDS)
+    index = {card.name: i for i, card in enumerate(game.CARDS)}
+    for card in deck:
+        counts[index[card.name]] += 1
+    return tuple(counts)
+
+def deck_from(counts):
+    return [card for card, count in zip(game.CARDS, counts) for _ in range(count)]
+
+def random_composition(size, rng):
+    return composition(game.random_deck(size, rng))
+
+def neighbours(counts):
+    """Every composition one card swap away."""
+    result = []
+    for i, have in enumerate(counts):
+        if not have:
+            continue
+        for j in range(len(counts)):
+            if j != i:
+                swapped = list(counts)
+                swapped[i] -= 1
+                swapped[j] += 1
+                result.append(tuple(swapped))
+    return result
+
+class DeckEvaluator:
+    """Scores compositions by their share of matches won (draws count half) against a reference deck."""
+
+    def __init__(self, reference, games=2000, seed=0, workers=None, max_turns=200,
+                 ais=("random", "random"), iterations=200):
+        self.reference = [card.name for card in reference]
+        self.games = games
+        self.seed = seed
+        self.workers = workers
+        self.max_turns = max_turns
+        self.ais = tuple(ais)
+        self.iterations = iterations
+        self.cache = {}  # composition -> score
+        self.hits = 0
+        self.pool = None
+
+    def scores(self, candidates):
+        """Scores for a list of compositions; the uncached ones are played as one batch."""
+        wanted = [counts for counts in dict.fromkeys(candidates) if counts not in self.cache]
+        self.hits += len(candidates) - len(wanted)
+        tasks = []
+        owners = []
+        for counts in wanted:
+            names = [card.name for card in deck_from(counts)]
+            for start, size in chunks(self.games, CHUNK_SIZE):
+                tasks.append((names, self.reference, start, size, self.seed, self.max_turns, self.ais,
+                              self.iterations))
+                owners.append(counts)
+        if tasks:
+            # One pool for the whole search rather than one per batch
+            if self.pool is None and self.workers != 1:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            totals = {}
+            for counts, stats in zip(owners, run_chunks(simulate_chunk, tasks, self.workers, self.pool)):
+                totals[counts] = merge(totals.get(counts), stats)
+            for counts, stats in totals.items():
+                self.cache[counts] = (stats["wins"]["Hero"] + stats["wins"][None] / 2) / stats["matches"]
+        return [self.cache[counts] for counts in candidates]
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+# ----------------------------
+# Search
+# ----------------------------
+
+def hill_climb(evaluator, start, log=None):
+    """Steepest ascent: move to the best one-card swap until none improves. Returns (counts, score)."""
+    current = start
+    score = evaluator.scores([start])[0]
+    while True:
+        if log:
+            log(current, score)
+        candidates = neighbours(current)
+        best_score, best = max(zip(evaluator.scores(candidates), candidates))
+        if best_score <= score:
+            return current, score
+        current, score = best, best_score
+
+def optimize(evaluator, starts, log=None):
+    """Hill-climb from every start. Returns the best (counts, score) found."""
+    best = None
+    for start in starts:
+        result = hill_climb(evaluator, start, log)
+        if best is None or result[1] > best[1]:
+            best = result
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Search for strong 15-card CardGame decks")
+    parser.add_argument("--size", type=int, default=15, help="cards per deck")
+    parser.add_argument("--games", type=int, default=2000, help="matches per candidate deck")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument("--max-turns", type=int, default=200)
+    parser.add_argument("--restarts", type=int, default=2, help="extra climbs from random decks")
+    parser.add_argument("--reference", help="deck to beat, comma separated (default: main()'s deck for --seed)")
+    parser.add_argument("--ai", choices=AIS, default="random", help="who plays both decks")
+    parser.add_argument("--ai-iterations", type=int, default=200, help="MCTS rollouts per turn")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.reference:
+        reference = [game.CARDS_BY_NAME[name.strip()] for name in args.reference.split(",")]
+    else:
+        reference = game.random_deck(args.size, rng)
+    print(f"Reference: {deck_summary(reference)}")
+    starts = [composition(reference)] + [random_composition(args.size, rng) for _ in range(args.restarts)]
+
+    evaluator = DeckEvaluator(reference, args.games, args.seed, args.workers, args.max_turns,
+                              (args.ai, args.ai), args.ai_iterations)
+    start = time.perf_counter()
+    try:
+        counts, score = optimize(evaluator, starts,
+                                 log=lambda counts, score: print(f"{score:>7.1%}  {deck_summary(deck_from(counts))}"))
+    finally:
+        evaluator.close()
+    elapsed = time.perf_counter() - start
+    print(f"\nBest deck ({score:.1%} against the reference):")
+    print(f"  {deck_summary(deck_from(counts))}")
+    print(f"  {','.join(card.name for card in deck_from(counts))}")
+    print(f"\n{len(evaluator.cache)} decks evaluated, {evaluator.hits} cache hits, {elapsed:.0f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import argparse
+import random
+import time
+
+import CardGame as game
+from cardgame_ai import KnapsackPlayer, MCTSPlayer
+from sim_pool import chunks, run_chunks
+
+# Headless match runner for CardGame: plays Hero-vs-Villain matches with the
+# game's own Player/Card rules, silently and without pauses, across a process
+# pool, and reports win rates, game lengths and how often each card was played.
+# Either side can be played by a computer player instead of at random.
+
+SIDES = ["Hero", "Villain"]
+
+AIS = ["random", "knapsack", "mcts"]
+
+# Matches per task sent to the pool
+CHUNK_SIZE = 5000
+
+# ----------------------------
+# Worker Side
+# ----------------------------
+
+def make_strategies(ais, iterations, seed):
+    """{side: strategy} for the sides not playing at random."""
+    strategies = {}
+    for side, ai in zip(SIDES, ais):
+        if ai == "knapsack":
+            strategies[side] = KnapsackPlayer()
+        elif ai == "mcts":
+            strategies[side] = MCTSPlayer(iterations=iterations, seed=f"{seed}:{side}")
+    return strategies
+
+def play_match(hero_deck, villain_deck, seed, max_turns=200, ais=("random", "random"), iterations=200):
+    """One silent match. Returns the finished Game (winner in game.winner)."""
+    rng = random.Random(seed)
+    hero = game.Player("Hero", hero_deck, verbose=False, rng=rng)
+    villain = game.Player("Villain", villain_deck, verbose=False, rng=rng)
+    match = game.Game(hero, villain, verbose=False, rng=rng, max_turns=max_turns,
+                      strategies=make_strategies(ais, iterations, seed))
+    match.winner = match.start_game()
+    return match
+
+def simulate_chunk(task):
+    """Play one chunk of matches and return its aggregate counters."""
+    hero_names, villain_names, first_match, matches, seed, max_turns, ais, iterations = task
+    hero_deck = [game.CARDS_BY_NAME[name] for name in hero_names]
+    villain_deck = [game.CARDS_BY_NAME[name] for name in villain_names]
+    lengths = [0] * (max_turns + 1)  # lengths[n]: matches that ended after n turns
+    stats = {
+        "matches": matches,
+        "wins": {"Hero": 0, "Villain": 0, None: 0},
+        "first_wins": 0,     # matches won by whoever moved first
+        "lengths": lengths,
+        "plays": {side: {} for side in SIDES},
+    }
+    for i in range(first_match, first_match + matches):
+        match = play_match(hero_deck, villain_deck, f"{seed}:{i}", max_turns, ais, iterations)
+        stats["wins"][match.winner] += 1
+        if match.winner == match.first_player.name:
+            stats["first_wins"] += 1
+        lengths[match.turns] += 1
+        for player in (match.player1, match.player2):
+            plays = stats["plays"][player.name]
+            for name, count in player.cards_played.items():
+                plays[name] = plays.get(name, 0) + count
+    return stats
+
+# ----------------------------
+# Runs and Aggregation
+# ----------------------------
+
+def merge(total, stats):
+    if total is None:
+        return stats
+    total["matches"] += stats["matches"]
+    total["first_wins"] += stats["first_wins"]
+    for key, count in stats["wins"].items():
+        total["wins"][key] += count
+    total["lengths"] = [a + b for a, b in zip(total["lengths"], stats["lengths"])]
+    for side, plays in stats["plays"].items():
+        side_total = total["plays"][side]
+        for name, count in plays.items():
+            side_total[name] = side_total.get(name, 0) + count
+    return total
+
+def run_matches(hero_deck, villain_deck, matches, seed=0, workers=None, max_turns=200,
+                ais=("random", "random"), iterations=200):
+    """Play `matches` games of hero_deck against villain_deck (lists of Cards).
+
+    Match i is seeded with f"{seed}:{i}", so the same seed gives identical
+    numbers whatever the number of workers. Matches still going after
+    max_turns turns count as draws. ais names who plays each side (one of
+    AIS; "mcts" searches `iterations` rollouts per turn).
+    """
+    hero_names = [card.name for card in hero_deck]
+    villain_names = [card.name for card in villain_deck]
+    # MCTS matches are slow enough that smaller chunks balance better
+    chunk = max(1, CHUNK_SIZE // iterations) if "mcts" in ais else CHUNK_SIZE
+    tasks = [(hero_names, villain_names, start, size, seed, max_turns, tuple(ais), iterations)
+             for start, size in chunks(matches, chunk)]
+    total = None
+    for stats in run_chunks(simulate_chunk, tasks, workers):
+        total = merge(total, stats)
+    return total
+
+def mean_length(stats):
+    return sum(n * count for n, count in enumerate(stats["lengths"])) / stats["matches"]
+
+def length_percentile(stats, fraction):
+    """Shortest game length that at least `fraction` of the matches finished within."""
+    wanted = fraction * stats["matches"]
+    seen = 0
+    for n, count in enumerate(stats["lengths"]):
+        seen += count
+        if seen >= wanted:
+            return n
+    return len(stats["lengths"]) - 1
+
+# ----------------------------
+# Report
+# ----------------------------
+
+def deck_summary(deck):
+    counts = {}
+    for card in deck:
+        counts[card.name] = counts.get(card.name, 0) + 1
+    return ", ".join(f"{count}x {name}" for name, count in sorted(counts.items()))
+
+def print_report(stats, hero_deck, villain_deck):
+    matches = stats["matches"]
+    wins = stats["wins"]
+    print(f"Hero:    {deck_summary(hero_deck)}")
+    print(f"Villain: {deck_summary(villain_deck)}")
+    print(f"\n=== {matches} matches ===")
+    print(f"Hero wins     {wins['Hero'] / matches:>8.1%}")
+    print(f"Villain wins  {wins['Villain'] / matches:>8.1%}")
+    print(f"Draws         {wins[None] / matches:>8.1%}")
+    print(f"First mover   {stats['first_wins'] / matches:>8.1%}")
+    print(f"\nGame length (turns): mean {mean_length(stats):.1f}, median {length_percentile(stats, 0.5)}, "
+          f"90% within {length_percentile(stats, 0.9)}")
+
+    print("\n=== Card plays per match ===")
+    names = sorted({name for plays in stats["plays"].values() for name in plays})
+    print(f"{'Card':<14}" + "".join(f"{side:>10}" for side in SIDES))
+    for name in names:
+        print(f"{name:<14}" + "".join(f"{stats['plays'][side].get(name, 0) / matches:>10.2f}" for side in SIDES))
+
+def parse_deck(text):
+    try:
+        return [game.CARDS_BY_NAME[name.strip()] for name in text.split(",")]
+    except KeyError as e:
+        raise argparse.ArgumentTypeError(f"unknown card {e.args[0]!r}, expected one of {', '.join(game.CARDS_BY_NAME)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Play silent CardGame matches and report win rates")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument("--max-turns", type=int, default=200, help="turns before a match counts as a draw")
+    parser.add_argument("--deck", type=parse_deck, help="Hero's cards, comma separated "
+                        "(default: a random 15-card deck dealt from --seed, as main() does)")
+    parser.add_argument("--villain-deck", type=parse_deck, help="Villain's cards (default: the Hero's deck)")
+    parser.add_argument("--hero-ai", choices=AIS, default="random")
+    parser.add_argument("--villain-ai", choices=AIS, default="random")
+    parser.add_argument("--ai-iterations", type=int, default=200, help="MCTS rollouts per turn")
+    args = parser.parse_args()
+
+    hero_deck = args.deck or game.random_deck(rng=random.Random(args.seed))
+    villain_deck = args.villain_deck or hero_deck
+    start = time.perf_counter()
+    stats = run_matches(hero_deck, villain_deck, args.games, args.seed, args.workers, args.max_turns,
+                        (args.hero_ai, args.villain_ai), args.ai_iterations)
+    elapsed = time.perf_counter() - start
+    print_report(stats, hero_deck, villain_deck)
+    print(f"\n{args.games} matches in {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    main()
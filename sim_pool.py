@@ -0,0 +1,31 @@
+from concurrent.futures import ProcessPoolExecutor
+
+# Chunked process-pool runner shared by the simulators (autobattle_sim,
+# cardgame_sim, cardgame_deck).
+#
+# The work is cut into chunks, one task each. Every run or match in a chunk is
+# seeded from its own index, so the chunk size only affects load balancing,
+# never the numbers.
+
+def chunks(total, size):
+    """(start, count) pairs covering range(total), at most size at a time."""
+    return [(start, min(size, total - start)) for start in range(0, total, size)]
+
+def run_chunks(worker, tasks, workers=None, pool=None):
+    """Yield worker(task) for every task, in task order.
+
+    With workers=1 the tasks run in this process. Otherwise they go to pool,
+    which is left running for the caller, or to a pool started and shut down
+    here.
+    """
+    if workers == 1:
+        yield from map(worker, tasks)
+        return
+    own = pool is None
+    if own:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        yield from pool.map(worker, tasks, chunksize=1)
+    finally:
+        if own:
+            pool.shutdown()